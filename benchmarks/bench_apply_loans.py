@@ -0,0 +1,35 @@
+import argparse
+import time
+from benchmarks.common import clear_tables, load_schema, make_loans
+from dao.loan_repository_impl import ILoanRepositoryImpl
+
+# Run from the project root against a scratch database, e.g.
+#   python -m benchmarks.bench_apply_loans --config bench.ini --count 20000
+# batch_size=1 is the one-at-a-time path: the same three inserts and one
+# commit per loan that apply_loan issues, minus the confirmation prompt.
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput of apply_loans by batch size")
+    parser.add_argument("--config", required=True, help="property file of a scratch database")
+    parser.add_argument("--count", type=int, default=20000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 100, 500, 2000])
+    args = parser.parse_args()
+
+    repo = ILoanRepositoryImpl(args.config)
+    with repo.pool.connection() as connection:
+        load_schema(connection)
+
+    print(f"{'batch':>6} {'loans':>8} {'failed':>7} {'seconds':>9} {'loans/s':>10}")
+    for batch_size in args.batch_sizes:
+        with repo.pool.connection() as connection:
+            clear_tables(connection)
+        start = time.perf_counter()
+        failures = repo.apply_loans(make_loans(args.count), batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        print(f"{batch_size:>6} {args.count:>8} {len(failures):>7} "
+              f"{elapsed:>9.3f} {args.count / elapsed:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
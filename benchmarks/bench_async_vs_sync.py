@@ -0,0 +1,77 @@
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dao.async_loan_repository_impl import AsyncLoanRepositoryImpl
+from dao.loan_repository_impl import ILoanRepositoryImpl
+
+# Run from the project root against a database that already holds loans
+# 1..--max-loan-id (bench_get_all_loans can seed one), e.g.
+#   python -m benchmarks.bench_async_vs_sync --config bench.ini --requests 20000 --concurrency 64
+# Each request is one calculate_emi lookup on a random loan id. The sync
+# implementation gets one thread per in-flight request.
+
+
+def percentile(latencies, fraction):
+    ordered = sorted(latencies)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def report(name, latencies, elapsed):
+    print(f"{name:>6} {len(latencies) / elapsed:>10.0f} "
+          f"{statistics.median(latencies) * 1000:>9.2f} "
+          f"{percentile(latencies, 0.99) * 1000:>9.2f}")
+
+
+def run_sync(config, loan_ids, concurrency):
+    repo = ILoanRepositoryImpl(config)
+
+    def request(loan_id):
+        start = time.perf_counter()
+        repo.calculate_emi(loan_id)
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        start = time.perf_counter()
+        latencies = list(executor.map(request, loan_ids))
+        elapsed = time.perf_counter() - start
+    report("sync", latencies, elapsed)
+
+
+async def run_async(config, loan_ids, concurrency):
+    repo = AsyncLoanRepositoryImpl(config)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def request(loan_id):
+        async with semaphore:
+            start = time.perf_counter()
+            await repo.calculate_emi(loan_id)
+            return time.perf_counter() - start
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(request(loan_id) for loan_id in loan_ids))
+    elapsed = time.perf_counter() - start
+    await repo.close()
+    report("async", latencies, elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Requests per second and p99 latency, sync vs async")
+    parser.add_argument("--config", required=True, help="property file of a seeded database")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--max-loan-id", type=int, default=10000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    loan_ids = [rng.randint(1, args.max_loan_id) for _ in range(args.requests)]
+
+    print(f"{'impl':>6} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9}")
+    run_sync(args.config, loan_ids, args.concurrency)
+    asyncio.run(run_async(args.config, loan_ids, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
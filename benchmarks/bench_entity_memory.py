@@ -0,0 +1,87 @@
+import argparse
+import gc
+import tracemalloc
+from dao.loan_sql import build_loan
+from entities.loan_frame import LoanFrame
+
+# Run from the project root, no database needed:
+#   python -m benchmarks.bench_entity_memory --count 1000000
+# Rows mimic the dictionaries the loan select returns, three loans per
+# customer, and are generated lazily so only the built result is measured.
+# "plain classes" is the baseline from before the entities were slotted:
+# the same classes without __slots__, one Customer per loan.
+
+
+def make_rows(count):
+    for loan_id in range(1, count + 1):
+        customer_id = (loan_id + 2) // 3
+        home = loan_id % 2 == 1
+        yield {
+            'loan_id': loan_id,
+            'customer_id': customer_id,
+            'principal_amount': 100000.0 + loan_id % 900000,
+            'interest_rate': 8.5,
+            'loan_term': 12 * (1 + loan_id % 20),
+            'loan_type': "HomeLoan" if home else "CarLoan",
+            'loan_status': "Pending",
+            'name': f"Customer {customer_id}",
+            'email_address': f"c{customer_id}@example.com",
+            'phone_number': "9000000000",
+            'address': "Chennai",
+            'credit_score': 500 + customer_id % 350,
+            'property_address': f"{loan_id} Main Road" if home else None,
+            'property_value': 5000000 if home else None,
+            'car_model': None if home else "Sedan",
+            'car_value': None if home else 800000
+        }
+
+
+_plain_classes = {}
+
+
+def plain(entity):
+    # A copy of a slotted entity as an instance of the same class without
+    # __slots__, attributes set in __init__ order so its __dict__ is laid
+    # out as the original classes' were.
+    cls = type(entity)
+    plain_cls = _plain_classes.get(cls)
+    if plain_cls is None:
+        plain_cls = _plain_classes[cls] = type(cls.__name__, (), {})
+    copy = plain_cls()
+    for klass in reversed(cls.__mro__):
+        for name in klass.__dict__.get('__slots__', ()):
+            value = getattr(entity, name)
+            setattr(copy, name, plain(value) if name == 'customer' else value)
+    return copy
+
+
+def measure(name, count, build):
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:>24} {current / 2**20:>9.0f} {current / count:>10.0f}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory held by a loaded loan book")
+    parser.add_argument("--count", type=int, default=1000000)
+    args = parser.parse_args()
+    count = args.count
+
+    print(f"{'representation':>24} {'MiB':>9} {'bytes/loan':>10}")
+    measure("plain classes", count,
+            lambda: [plain(build_loan(row)) for row in make_rows(count)])
+    measure("entities", count,
+            lambda: [build_loan(row) for row in make_rows(count)])
+    customers = {}
+    measure("entities, interned", count,
+            lambda: [build_loan(row, customers) for row in make_rows(count)])
+    frame = LoanFrame()
+    measure("LoanFrame", count, lambda: frame.extend(make_rows(count)) or frame)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import argparse
+import contextlib
+import os
+import time
+import tracemalloc
+from benchmarks.common import make_loans
+from benchmarks.run_suite import create_repository
+from util.loan_exporter import LoanExporter
+
+# LoanExporter against the old way of dumping the book, display_all_loans'
+# print_info() on every entity. Each path runs twice: once for wall time and
+# once under tracemalloc for peak Python memory. Run from the project root:
+#   python -m benchmarks.bench_export --backend sqlite --size 200000
+#   python -m benchmarks.bench_export --backend mysql --config bench.ini --size 1000000
+
+
+def print_info_dump(repo, path):
+    with open(path, "w") as f, contextlib.redirect_stdout(f):
+        for loan in repo.iter_loans():
+            loan.print_info()
+            print("----------------------")
+
+
+def exporter(file_format, chunk_size):
+    def dump(repo, path):
+        f = LoanExporter.open_output(path, file_format)
+        with f:
+            LoanExporter.export(repo, f, file_format, chunk_size)
+    return dump
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk export throughput and memory")
+    parser.add_argument("--backend", choices=("sqlite", "memory", "mysql"), default="sqlite")
+    parser.add_argument("--config", default="config.ini",
+                        help="property file; for mysql it must point at a scratch database")
+    parser.add_argument("--size", type=int, default=200000)
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--output-dir", default="/tmp")
+    args = parser.parse_args()
+
+    repo = create_repository(args.backend, args.config)
+    repo.apply_loans(make_loans(args.size), batch_size=1000)
+
+    paths = (
+        ("print_info", print_info_dump, "loans.txt"),
+        ("csv", exporter("csv", args.chunk_size), "loans.csv"),
+        ("jsonl", exporter("jsonl", args.chunk_size), "loans.jsonl"),
+        ("parquet", exporter("parquet", args.chunk_size), "loans.parquet")
+    )
+    print(f"{'path':<11} {'seconds':>8} {'rows/s':>10} {'peak MiB':>9} {'file MiB':>9}")
+    for name, dump, file_name in paths:
+        path = os.path.join(args.output_dir, f"bench_export_{file_name}")
+        try:
+            start = time.perf_counter()
+            dump(repo, path)
+            elapsed = time.perf_counter() - start
+
+            tracemalloc.start()
+            dump(repo, path)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        except ValueError as e:
+            print(f"{name:<11} skipped: {e}")
+            continue
+        print(f"{name:<11} {elapsed:>8.2f} {args.size / elapsed:>10.0f} "
+              f"{peak / 2 ** 20:>9.1f} {os.path.getsize(path) / 2 ** 20:>9.1f}")
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
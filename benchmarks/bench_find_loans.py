@@ -0,0 +1,74 @@
+import argparse
+import time
+from benchmarks.common import make_loans
+from benchmarks.run_suite import create_repository
+
+# find_loans against the old way of searching: get_all_loans and a filter
+# in Python. Run from the project root, e.g.
+#   python -m benchmarks.bench_find_loans --backend sqlite --size 100000
+#   python -m benchmarks.bench_find_loans --backend mysql --config bench.ini
+
+SEARCHES = (
+    ("customer's loans", {'customer_id': 4242}, "loan_id", None),
+    ("pending car loans > 4M", {'loan_status': "Pending", 'loan_type': "CarLoan",
+                                'min_principal': 4000000}, "-principal_amount", None),
+    ("principal 1M-1.01M", {'min_principal': 1000000, 'max_principal': 1010000},
+     "principal_amount", None),
+    ("top 100 by principal", {}, "-principal_amount", 100)
+)
+
+
+def python_filter(loans, filters, order_by, limit):
+    def matches(loan):
+        for name, value in filters.items():
+            if name == 'min_principal':
+                if loan.principal_amount < value:
+                    return False
+            elif name == 'max_principal':
+                if loan.principal_amount > value:
+                    return False
+            elif name == 'customer_id':
+                if loan.customer.customer_id != value:
+                    return False
+            elif getattr(loan, name) != value:
+                return False
+        return True
+
+    column = order_by.lstrip("-")
+    found = sorted((loan for loan in loans if matches(loan)),
+                   key=lambda loan: (getattr(loan, column), loan.loan_id),
+                   reverse=order_by.startswith("-"))
+    return found if limit is None else found[:limit]
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="find_loans vs get_all_loans and a Python filter")
+    parser.add_argument("--backend", choices=("sqlite", "memory", "mysql"), default="sqlite")
+    parser.add_argument("--config", default="config.ini",
+                        help="property file; for mysql it must point at a scratch database")
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    repo = create_repository(args.backend, args.config)
+    repo.apply_loans(make_loans(args.size), batch_size=1000)
+
+    print(f"{'search':<24} {'rows':>6} {'find_loans ms':>14} {'python ms':>10} {'speedup':>8}")
+    for name, filters, order_by, limit in SEARCHES:
+        pushed, found = timed(lambda: repo.find_loans(filters, order_by, limit), args.repeat)
+        scanned, expected = timed(
+            lambda: python_filter(repo.get_all_loans(), filters, order_by, limit), args.repeat)
+        assert [loan.loan_id for loan in found] == [loan.loan_id for loan in expected]
+        print(f"{name:<24} {len(found):>6} {pushed * 1000:>14.2f} {scanned * 1000:>10.2f} "
+              f"{scanned / pushed:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import argparse
+import time
+from benchmarks.common import CountingPool, clear_tables, load_schema
+from dao.loan_repository_impl import ILoanRepositoryImpl
+
+# Run from the project root against a scratch database, e.g.
+#   python -m benchmarks.bench_get_all_loans --config bench.ini --sizes 10000 100000 1000000
+# The tables in that database are emptied and re-seeded for every size.
+
+SEED_BATCH = 10000
+
+
+def seed(connection, size):
+    clear_tables(connection)
+    cursor = connection.cursor()
+    for start in range(1, size + 1, SEED_BATCH):
+        ids = range(start, min(start + SEED_BATCH, size + 1))
+        cursor.executemany("""
+            INSERT INTO Customer (customer_id, name, email_address, phone_number, address, credit_score)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, [(i, f"Customer {i}", f"c{i}@example.com", "9000000000", "Chennai", 500 + i % 350)
+              for i in ids])
+        cursor.executemany("""
+            INSERT INTO Loan (loan_id, customer_id, principal_amount, interest_rate, loan_term, loan_type, loan_status)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """, [(i, i, 100000 + i % 900000, 8.5, 12 * (1 + i % 20),
+               "HomeLoan" if i % 2 else "CarLoan", "Pending") for i in ids])
+        cursor.executemany("""
+            INSERT INTO HomeLoan (loan_id, property_address, property_value)
+            VALUES (%s, %s, %s)
+        """, [(i, f"{i} Main Road", 5000000) for i in ids if i % 2])
+        cursor.executemany("""
+            INSERT INTO CarLoan (loan_id, car_model, car_value)
+            VALUES (%s, %s, %s)
+        """, [(i, "Sedan", 800000) for i in ids if not i % 2])
+        connection.commit()
+    cursor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query count and wall time of get_all_loans")
+    parser.add_argument("--config", required=True, help="property file of a scratch database")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    args = parser.parse_args()
+
+    repo = ILoanRepositoryImpl(args.config)
+    pool = repo.pool
+    with pool.connection() as connection:
+        load_schema(connection)
+
+    print(f"{'loans':>10} {'queries':>8} {'seconds':>9}")
+    for size in args.sizes:
+        with pool.connection() as connection:
+            seed(connection, size)
+        repo.pool = CountingPool(pool)
+        start = time.perf_counter()
+        loans = repo.get_all_loans()
+        elapsed = time.perf_counter() - start
+        print(f"{len(loans):>10} {repo.pool.counter['queries']:>8} {elapsed:>9.3f}")
+        repo.pool = pool
+
+
+if __name__ == "__main__":
+    main()
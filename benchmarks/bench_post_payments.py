@@ -0,0 +1,54 @@
+import argparse
+import random
+import time
+from benchmarks.common import make_loans
+from benchmarks.run_suite import create_repository
+from entities.payment import Payment
+from util.loan_calculator import LoanCalculator
+
+# Throughput of post_payments on a synthetic daily bank file, then the same
+# file posted again to show it is idempotent. Run from the project root, e.g.
+#   python -m benchmarks.bench_post_payments --backend sqlite --loans 100000 --payments 300000
+#   python -m benchmarks.bench_post_payments --backend mysql --config bench.ini
+
+
+def bank_file(loans, count, seed=0):
+    # Mostly one EMI, some two or three, a few short payments that get rejected.
+    rng = random.Random(seed)
+    emis = {loan.loan_id: LoanCalculator.emi_amount(loan.principal_amount, loan.interest_rate,
+                                                    loan.loan_term) for loan in loans}
+    loan_ids = list(emis)
+    for number in range(count):
+        loan_id = rng.choice(loan_ids)
+        multiple = rng.choices((1, 2, 3, 0.5), weights=(85, 8, 4, 3))[0]
+        yield Payment(f"BANK-{seed}-{number:09d}", loan_id, round(emis[loan_id] * multiple + 0.01, 2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batched payment posting throughput")
+    parser.add_argument("--backend", choices=("sqlite", "memory", "mysql"), default="sqlite")
+    parser.add_argument("--config", default="config.ini",
+                        help="property file; for mysql it must point at a scratch database")
+    parser.add_argument("--loans", type=int, default=100000)
+    parser.add_argument("--payments", type=int, default=300000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    repo = create_repository(args.backend, args.config)
+    loans = list(make_loans(args.loans))
+    repo.apply_loans(loans, batch_size=1000)
+    payments = list(bank_file(loans, args.payments))
+
+    for run in ("first post", "re-post"):
+        for payment in payments:
+            payment.payment_date = None
+        start = time.perf_counter()
+        result = repo.post_payments(payments, batch_size=args.batch_size)
+        elapsed = time.perf_counter() - start
+        print(f"{run:<11} {result['posted']:>9} posted {result['duplicates']:>9} duplicates "
+              f"{len(result['rejected']):>7} rejected {elapsed:>8.2f}s "
+              f"{len(payments) / elapsed:>10.0f} payments/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import time
+from benchmarks.common import make_loans
+from benchmarks.run_suite import create_repository
+from util.shard_runner import JOBS, ShardRunner
+
+# ShardRunner at increasing worker counts against the same book; speedup is
+# relative to a single worker. Workers need a database they can all open, so
+# the sqlite backend writes a file in a temporary directory instead of the
+# suite's in-memory database. Run from the project root:
+#   python -m benchmarks.bench_shard_runner --size 200000 --workers 1 2 4 8
+#   python -m benchmarks.bench_shard_runner --backend mysql --config bench.ini --job rescore
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sharded job throughput by worker count")
+    parser.add_argument("--backend", choices=("sqlite", "mysql"), default="sqlite")
+    parser.add_argument("--config", default="config.ini",
+                        help="property file; for mysql it must point at a scratch database")
+    parser.add_argument("--size", type=int, default=200000)
+    parser.add_argument("--job", choices=sorted(JOBS), nargs="+", default=["emi", "rescore"])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="bench_shard_")
+    try:
+        config = args.config
+        if args.backend == "sqlite":
+            config = os.path.join(work_dir, "bench.ini")
+            with open(config, "w") as f:
+                f.write(f"[database]\nbackend = sqlite\n"
+                        f"sqlite_path = {os.path.join(work_dir, 'bench.db')}\n")
+            from dao.sqlite_loan_repository_impl import SQLiteLoanRepositoryImpl
+            repo = SQLiteLoanRepositoryImpl(os.path.join(work_dir, "bench.db"), config)
+        else:
+            repo = create_repository(args.backend, config)
+        repo.apply_loans(make_loans(args.size), batch_size=1000)
+        del repo
+
+        print(f"{'job':<10} {'workers':>7} {'seconds':>8} {'loans/s':>10} {'speedup':>8}")
+        for job in args.job:
+            single = None
+            for workers in args.workers:
+                # Every run re-scores the whole book; with the default of
+                # Pending loans only the first run would find any.
+                runner = ShardRunner(job, config, os.path.join(work_dir, f"{job}-{workers}"),
+                                     workers, loan_status=None)
+                start = time.perf_counter()
+                with contextlib.redirect_stderr(io.StringIO()):
+                    totals = runner.run(restart=True)
+                elapsed = time.perf_counter() - start
+                single = single or elapsed
+                print(f"{job:<10} {workers:>7} {elapsed:>8.2f} "
+                      f"{totals['loans'] / elapsed:>10.0f} {single / elapsed:>7.2f}x")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
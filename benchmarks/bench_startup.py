@@ -0,0 +1,63 @@
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+# Wall time of short-lived invocations, each in a fresh interpreter, and
+# how many modules they load. Run from the project root:
+#   python -m benchmarks.bench_startup --repeat 20
+# "repository" builds the configured repository without running a query,
+# which should neither import the driver nor connect.
+
+SCENARIOS = (
+    ("interpreter", "pass"),
+    ("calculator", "from util.loan_calculator import LoanCalculator; "
+                   "LoanCalculator.emi_amount(500000, 8.5, 240)"),
+    ("main --help", "import sys, main; sys.argv = ['main.py', '--help']\n"
+                    "try:\n    main.main()\nexcept SystemExit:\n    pass"),
+    ("main calculate", "import main\n"
+                       "try:\n    main.main(['calculate', '500000', '8.5', '240'])\n"
+                       "except SystemExit:\n    pass"),
+    ("repository", "from dao.loan_repository_impl import ILoanRepositoryImpl; "
+                   "ILoanRepositoryImpl()"),
+    ("mysql driver", "import mysql.connector")
+)
+
+REPORT = ("\nimport sys\n"
+          "print(len(sys.modules), type(sys.modules.get('mysql.connector')).__name__, "
+          "file=sys.stderr)")
+
+
+def run(code):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", code + REPORT],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr)
+    modules, driver = result.stderr.split()[-2:]
+    return elapsed, int(modules), driver
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup time of short-lived invocations")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'scenario':<16} {'median ms':>10} {'min ms':>8} {'modules':>8}  mysql.connector")
+    for name, code in SCENARIOS:
+        try:
+            runs = [run(code) for _ in range(args.repeat)]
+        except RuntimeError as e:
+            print(f"{name:<16} failed: {str(e).strip().splitlines()[-1]}")
+            continue
+        times = [elapsed * 1000 for elapsed, _, _ in runs]
+        modules, driver = runs[-1][1], runs[-1][2]
+        driver = {"NoneType": "not imported", "_LazyModule": "deferred"}.get(driver, "loaded")
+        print(f"{name:<16} {statistics.median(times):>10.1f} {min(times):>8.1f} "
+              f"{modules:>8}  {driver}")
+
+
+if __name__ == "__main__":
+    main()
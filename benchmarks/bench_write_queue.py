@@ -0,0 +1,127 @@
+import argparse
+import os
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+from benchmarks.common import make_loans
+from benchmarks.run_suite import create_repository
+from dao.loan_write_queue import LoanWriteQueue
+
+# Loan applications from concurrent clients, written directly (one
+# apply_loans transaction per loan) against the write-behind queue in both
+# durability modes. "submit" is how long the caller is blocked per loan,
+# "ack" how long until the loan is committed; throughput counts until the
+# last loan is committed. The sqlite backend uses a file so every commit
+# pays for a journal sync, as MySQL pays for a log flush. Run from the
+# project root:
+#   python -m benchmarks.bench_write_queue --size 20000 --clients 16
+#   python -m benchmarks.bench_write_queue --clients 4 --max-delay-ms 5
+#   python -m benchmarks.bench_write_queue --backend mysql --config bench.ini
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def run_clients(loans, clients, submit):
+    # submit(loan, acks, lock) returns (seconds blocked, seconds until
+    # committed); the second is None when a callback adds it to acks later.
+    submits = []
+    acks = []
+    lock = threading.Lock()
+
+    def client(share):
+        for loan in share:
+            blocked, acked = submit(loan, acks, lock)
+            with lock:
+                submits.append(blocked)
+                if acked is not None:
+                    acks.append(acked)
+
+    threads = [threading.Thread(target=client, args=(loans[index::clients],))
+               for index in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return submits, acks, start
+
+
+def direct(repo):
+    def submit(loan, acks, lock):
+        start = time.perf_counter()
+        repo.apply_loans([loan], batch_size=1)
+        elapsed = time.perf_counter() - start
+        return elapsed, elapsed
+    return submit
+
+
+def write_behind(write_queue):
+    def submit(loan, acks, lock):
+        start = time.perf_counter()
+        future = write_queue.submit(loan)
+        blocked = time.perf_counter() - start
+        if write_queue.durability == 'commit':
+            future.result()
+            return blocked, time.perf_counter() - start
+
+        def acked(_, start=start):
+            with lock:
+                acks.append(time.perf_counter() - start)
+        future.add_done_callback(acked)
+        return blocked, None
+    return submit
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write-behind submit latency and throughput")
+    parser.add_argument("--backend", choices=("sqlite", "mysql"), default="sqlite")
+    parser.add_argument("--config", default="config.ini",
+                        help="property file; for mysql it must point at a scratch database")
+    parser.add_argument("--size", type=int, default=20000)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--max-delay-ms", type=float, default=0)
+    parser.add_argument("--max-pending", type=int, default=10000)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="bench_write_queue_")
+    try:
+        print(f"{'mode':<9} {'loans/s':>9} {'submit p50':>11} {'submit p99':>11} "
+              f"{'ack p50':>9} {'ack p99':>9}   (ms)")
+        for mode in ("direct", "commit", "enqueue"):
+            if args.backend == "sqlite":
+                from dao.sqlite_loan_repository_impl import SQLiteLoanRepositoryImpl
+                repo = SQLiteLoanRepositoryImpl(os.path.join(work_dir, f"{mode}.db"),
+                                                args.config)
+            else:
+                repo = create_repository(args.backend, args.config)
+            loans = list(make_loans(args.size))
+
+            write_queue = None
+            if mode == "direct":
+                submit = direct(repo)
+            else:
+                write_queue = LoanWriteQueue(repo, args.max_pending, args.batch_size,
+                                             args.max_delay_ms / 1000, durability=mode)
+                submit = write_behind(write_queue)
+            submits, acks, start = run_clients(loans, args.clients, submit)
+            if write_queue:
+                write_queue.close()
+            elapsed = time.perf_counter() - start
+
+            print(f"{mode:<9} {args.size / elapsed:>9.0f} "
+                  f"{statistics.median(submits) * 1000:>11.3f} "
+                  f"{percentile(submits, 0.99) * 1000:>11.3f} "
+                  f"{statistics.median(acks) * 1000:>9.3f} "
+                  f"{percentile(acks, 0.99) * 1000:>9.3f}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
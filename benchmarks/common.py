@@ -0,0 +1,92 @@
+import random
+from contextlib import contextmanager
+from entities.car_loan import CarLoan
+from entities.customer import Customer
+from entities.home_loan import HomeLoan
+from util.db_migration_util import DBMigrationUtil
+
+
+def load_schema(connection):
+    cursor = connection.cursor()
+    with open("db/schema.sql") as f:
+        for statement in f.read().split(";"):
+            if statement.strip():
+                cursor.execute(statement)
+    cursor.close()
+    DBMigrationUtil.apply_migrations(connection)
+
+
+def clear_tables(connection):
+    cursor = connection.cursor()
+    for table in ("Payment", "HomeLoan", "CarLoan", "Loan", "Customer"):
+        cursor.execute(f"DELETE FROM {table}")
+    connection.commit()
+    cursor.close()
+
+
+def make_loans(count, start=1, loans_per_customer=3, home_share=0.5, seed=0):
+    # Deterministic synthetic book: the same arguments always produce the
+    # same customers, amounts and loan types.
+    rng = random.Random(seed * 1000003 + start)
+    for loan_id in range(start, start + count):
+        customer_id = (loan_id + loans_per_customer - 1) // loans_per_customer
+        customer = Customer(customer_id, f"Customer {customer_id}",
+                            f"c{customer_id}@example.com", "9000000000",
+                            "Chennai", 500 + customer_id * 7919 % 350)
+        principal = rng.randrange(100000, 5000000, 1000)
+        term = 12 * rng.randint(1, 30)
+        if rng.random() < home_share:
+            yield HomeLoan(loan_id, customer, principal, rng.choice((7.5, 8.0, 8.5, 9.0)),
+                           term, "Pending", f"{loan_id} Main Road",
+                           principal + rng.randrange(0, 2000000, 1000))
+        else:
+            yield CarLoan(loan_id, customer, principal, rng.choice((9.0, 9.25, 10.5)),
+                          term, "Pending", rng.choice(("Sedan", "Hatchback", "SUV")),
+                          principal + rng.randrange(0, 200000, 1000))
+
+
+class CountingCursor:
+    def __init__(self, cursor, counter):
+        self._cursor = cursor
+        self._counter = counter
+
+    def execute(self, *args, **kwargs):
+        self._counter['queries'] += 1
+        return self._cursor.execute(*args, **kwargs)
+
+    def executemany(self, *args, **kwargs):
+        self._counter['queries'] += 1
+        return self._cursor.executemany(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class CountingConnection:
+    def __init__(self, connection, counter):
+        self._connection = connection
+        self._counter = counter
+
+    def cursor(self, *args, **kwargs):
+        return CountingCursor(self._connection.cursor(*args, **kwargs), self._counter)
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+
+# Pings the pool sends on checkout count as queries: each is a round trip
+# to the server like any statement.
+class CountingPool:
+    def __init__(self, pool):
+        self._pool = pool
+        self.counter = {'queries': 0}
+
+    @contextmanager
+    def connection(self):
+        pings = getattr(self._pool, 'pings', 0)
+        with self._pool.connection() as connection:
+            self.counter['queries'] += getattr(self._pool, 'pings', 0) - pings
+            yield CountingConnection(connection, self.counter)
+
+    def __getattr__(self, name):
+        return getattr(self._pool, name)
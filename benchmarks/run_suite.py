@@ -0,0 +1,177 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from benchmarks.common import (CountingConnection, CountingPool, clear_tables, load_schema,
+                               make_loans)
+from util.loan_calculator import LoanCalculator
+from util.portfolio_calculator import PortfolioCalculator
+
+# Benchmark suite for the repository and calculator hot paths. Run from the
+# project root, e.g.
+#   python -m benchmarks.run_suite --backend sqlite --scales 10000 100000
+#   python -m benchmarks.run_suite --backend mysql --config bench.ini --scales 10000
+# Results go to --output as JSON; with --baseline each result is compared to
+# the stored one and the run exits non-zero on a regression: more queries
+# than the baseline, or a slowdown beyond --tolerance.
+
+DEFAULT_BASELINE = "benchmarks/baseline.json"
+# Slowdowns smaller than this are timer noise, whatever the ratio.
+NOISE_SECONDS = 0.01
+
+
+def create_repository(backend, config):
+    if backend == "sqlite":
+        from dao.sqlite_loan_repository_impl import SQLiteLoanRepositoryImpl
+        return SQLiteLoanRepositoryImpl(":memory:", config)
+    if backend == "memory":
+        from dao.memory_loan_repository_impl import InMemoryLoanRepositoryImpl
+        return InMemoryLoanRepositoryImpl(config)
+    from dao.loan_repository_impl import ILoanRepositoryImpl
+    repo = ILoanRepositoryImpl(config)
+    with repo.pool.connection() as connection:
+        load_schema(connection)
+        clear_tables(connection)
+    return repo
+
+
+def install_counter(repo):
+    # Counts statements sent to the database; the in-memory backend has
+    # none, so its counter stays at zero.
+    if hasattr(repo, 'pool'):
+        repo.pool = CountingPool(repo.pool)
+        return repo.pool.counter
+    counter = {'queries': 0}
+    if hasattr(repo, 'connection'):
+        repo.connection = CountingConnection(repo.connection, counter)
+    return counter
+
+
+class Suite:
+    def __init__(self, backend, scale):
+        self.backend = backend
+        self.scale = scale
+        self.results = []
+
+    def measure(self, name, ops, counter, func):
+        before = counter['queries']
+        start = time.perf_counter()
+        func()
+        seconds = time.perf_counter() - start
+        result = {
+            'backend': self.backend,
+            'scale': self.scale,
+            'name': name,
+            'ops': ops,
+            'seconds': round(seconds, 6),
+            'us_per_op': round(seconds / ops * 1e6, 3),
+            'queries': counter['queries'] - before
+        }
+        self.results.append(result)
+        print(f"{self.backend:>7} {self.scale:>9} {name:<22} {ops:>9} "
+              f"{result['us_per_op']:>12.1f} {result['queries']:>9}")
+
+
+def run_scale(backend, config, scale, lookups, seed):
+    repo = create_repository(backend, config)
+    counter = install_counter(repo)
+    suite = Suite(backend, scale)
+    rng = random.Random(seed)
+    ids = [rng.randint(1, scale) for _ in range(lookups)]
+    single = min(lookups, 1000)
+
+    suite.measure("apply_loans", scale, counter,
+                  lambda: repo.apply_loans(make_loans(scale, seed=seed), batch_size=500))
+    suite.measure("apply_loans_single", single, counter,
+                  lambda: repo.apply_loans(make_loans(single, start=scale + 1, seed=seed),
+                                           batch_size=1))
+    total = scale + single
+    suite.measure("get_all_loans", total, counter, repo.get_all_loans)
+    suite.measure("iter_loans", total, counter,
+                  lambda: sum(1 for _ in repo.iter_loans(batch_size=1000)))
+    suite.measure("get_loan_by_id", lookups, counter,
+                  lambda: [repo.get_loan_by_id(loan_id) for loan_id in ids])
+    suite.measure("calculate_emi", lookups, counter,
+                  lambda: [repo.calculate_emi(loan_id) for loan_id in ids])
+    suite.measure("loan_status", lookups, counter,
+                  lambda: [repo.loan_status(loan_id) for loan_id in ids])
+    suite.measure("decide_loans", total, counter,
+                  lambda: repo.decide_loans(loan_status=None))
+
+    columns = {}
+    suite.measure("get_loan_columns", total, counter,
+                  lambda: columns.update(repo.get_loan_columns()))
+    rows = list(zip(columns['principal_amount'], columns['interest_rate'], columns['loan_term']))
+    suite.measure("emi_amount_scalar", len(rows), counter,
+                  lambda: [LoanCalculator.emi_amount(p, r, n) for p, r, n in rows])
+    suite.measure("interest_amount_scalar", len(rows), counter,
+                  lambda: [LoanCalculator.interest_amount(p, r, n) for p, r, n in rows])
+    suite.measure("portfolio_calculate", len(rows), counter,
+                  lambda: PortfolioCalculator.calculate(columns))
+    return suite.results
+
+
+def compare(results, baseline, tolerance):
+    expected = {(r['backend'], r['scale'], r['name']): r for r in baseline['results']}
+    regressions = []
+    for result in results:
+        reference = expected.get((result['backend'], result['scale'], result['name']))
+        if reference is None:
+            continue
+        if result['queries'] > reference['queries']:
+            regressions.append(f"{result['name']} @ {result['scale']}: "
+                               f"{result['queries']} queries, baseline {reference['queries']}")
+        slower = result['seconds'] - reference['seconds']
+        if result['seconds'] > reference['seconds'] * tolerance and slower > NOISE_SECONDS:
+            regressions.append(f"{result['name']} @ {result['scale']}: "
+                               f"{result['seconds']:.3f}s, baseline {reference['seconds']:.3f}s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Repository and calculator benchmark suite")
+    parser.add_argument("--backend", choices=("sqlite", "memory", "mysql"), default="sqlite")
+    parser.add_argument("--config", default="config.ini",
+                        help="property file; for mysql it must point at a scratch database")
+    parser.add_argument("--scales", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--lookups", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", help=f"compare against a stored run, e.g. {DEFAULT_BASELINE}")
+    parser.add_argument("--tolerance", type=float, default=1.5,
+                        help="allowed slowdown factor against the baseline")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="write this run to --baseline instead of comparing")
+    args = parser.parse_args()
+
+    print(f"{'backend':>7} {'scale':>9} {'benchmark':<22} {'ops':>9} {'us/op':>12} {'queries':>9}")
+    results = []
+    for scale in args.scales:
+        results.extend(run_scale(args.backend, args.config, scale, args.lookups, args.seed))
+
+    run = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': results
+    }
+    with open(args.output, "w") as f:
+        json.dump(run, f, indent=2)
+
+    if args.baseline and args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(run, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+    elif args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,405 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Iterable, List, Tuple
+from dao.loan_cache import LoanCache
+from dao.loan_sql import (LOAN_SELECT, CUSTOMER_UPSERT, LOAN_INSERT, HOME_LOAN_INSERT,
+                          CAR_LOAN_INSERT, LOAN_PAGE_SELECT, LOAN_BY_ID_SELECT,
+                          LOAN_STATUS_UPDATE, PORTFOLIO_GROUPS, PAYMENT_INSERT,
+                          PAYMENTS_BY_LOAN_SELECT, LOAN_BALANCE_UPDATE, LOAN_TERMS_SELECT,
+                          LOAN_TERMS_MISSING, LOAN_TERMS_FILL, LOAN_TERMS_UPDATE, balance_params,
+                          build_loan, build_payment, decide_loans_sql, extend_loan_columns,
+                          fill_params, find_loans_sql, insert_params, loan_columns_sql,
+                          loan_frame_sql, new_loan_columns, payment_params,
+                          posted_references_sql, posting_state, posting_state_sql,
+                          stored_terms, terms_update_params)
+from dao.portfolio_summary import PortfolioSummary
+from entities.loan import Loan
+from entities.loan_frame import LoanFrame
+from entities.payment import Payment
+from exceptions.invalid_loan_exception import InvalidLoanException
+from util.db_property_util import DBPropertyUtil
+from util.lazy_module import lazy_import
+from util.loan_calculator import LoanCalculator
+from util.payment_posting import PaymentPosting
+
+aiomysql = lazy_import("aiomysql")
+
+# asyncio counterpart of ILoanRepositoryImpl for serving lookups behind an
+# async web tier. Every method that touches the database is a coroutine and
+# borrows a connection from an aiomysql pool only for its own transaction;
+# the pure calculators stay plain methods. apply_loan does not prompt for
+# confirmation, since there is no terminal to prompt on.
+class AsyncLoanRepositoryImpl:
+    def __init__(self, property_file="config.ini"):
+        self.connection_params = DBPropertyUtil.get_connection_string(property_file)
+        self.credit_rules = DBPropertyUtil.get_credit_rules(property_file)
+
+        cache_settings = DBPropertyUtil.get_cache_settings(property_file)
+        self.cache = None
+        if cache_settings['enabled']:
+            self.cache = LoanCache(cache_settings['max_entries'],
+                                   cache_settings['ttl_seconds'])
+
+        self.pool = None
+        self._pool_lock = asyncio.Lock()
+
+    async def close(self) -> None:
+        if self.pool is not None:
+            self.pool.close()
+            await self.pool.wait_closed()
+            self.pool = None
+
+    async def _get_pool(self):
+        async with self._pool_lock:
+            if self.pool is None:
+                self.pool = await aiomysql.create_pool(
+                    host=self.connection_params['host'],
+                    port=self.connection_params['port'],
+                    db=self.connection_params['database'],
+                    user=self.connection_params['user'],
+                    password=self.connection_params['password'],
+                    maxsize=self.connection_params['pool_size'],
+                    autocommit=False,
+                    pool_recycle=3600
+                )
+        return self.pool
+
+    @asynccontextmanager
+    async def _cursor(self, dictionary=False):
+        pool = await self._get_pool()
+        async with pool.acquire() as connection:
+            cursor_class = aiomysql.DictCursor if dictionary else aiomysql.Cursor
+            async with connection.cursor(cursor_class) as cursor:
+                try:
+                    yield connection, cursor
+                except BaseException:
+                    await connection.rollback()
+                    raise
+                if connection.get_transaction_status():
+                    await connection.rollback()
+
+    async def apply_loan(self, loan: Loan) -> None:
+        try:
+            async with self._cursor() as (connection, cursor):
+                await self._insert_loans(cursor, [loan])
+                await connection.commit()
+            self._invalidate([loan])
+        except aiomysql.Error as e:
+            raise InvalidLoanException(f"Error applying for loan: {e}")
+
+    async def apply_loans(self, loans: Iterable[Loan],
+                          batch_size: int = 500) -> List[Tuple[Loan, str]]:
+        failures = []
+        batch = []
+        for loan in loans:
+            batch.append(loan)
+            if len(batch) == batch_size:
+                failures.extend(await self._apply_batch(batch))
+                batch = []
+        if batch:
+            failures.extend(await self._apply_batch(batch))
+        return failures
+
+    async def _apply_batch(self, batch: List[Loan]) -> List[Tuple[Loan, str]]:
+        try:
+            async with self._cursor() as (connection, cursor):
+                await self._insert_loans(cursor, batch)
+                await connection.commit()
+            self._invalidate(batch)
+            return []
+        except (aiomysql.Error, InvalidLoanException) as e:
+            if len(batch) == 1:
+                return [(batch[0], str(e))]
+
+        failures = []
+        for loan in batch:
+            failures.extend(await self._apply_batch([loan]))
+        return failures
+
+    def _invalidate(self, loans: List[Loan]) -> None:
+        if self.cache:
+            for loan in loans:
+                self.cache.invalidate(loan.loan_id)
+                # The batch upserted this customer, so the copies of it held
+                # by their other cached loans may be stale too.
+                self.cache.invalidate_customer(loan.customer.customer_id)
+
+    async def _insert_loans(self, cursor, loans: List[Loan]) -> None:
+        customers, base_loans, home_loans, car_loans = insert_params(loans)
+        await cursor.executemany(CUSTOMER_UPSERT, customers)
+        await cursor.executemany(LOAN_INSERT, base_loans)
+        if home_loans:
+            await cursor.executemany(HOME_LOAN_INSERT, home_loans)
+        if car_loans:
+            await cursor.executemany(CAR_LOAN_INSERT, car_loans)
+
+    async def calculate_interest(self, loan_id: int) -> float:
+        return (await self._stored_terms(loan_id))[1]
+
+    async def _stored_terms(self, loan_id: int) -> Tuple[float, float]:
+        try:
+            async with self._cursor() as (connection, cursor):
+                await cursor.execute(LOAN_TERMS_SELECT, (loan_id,))
+                row = await cursor.fetchone()
+        except aiomysql.Error as e:
+            raise InvalidLoanException(f"Error retrieving loan: {e}")
+        if not row:
+            raise InvalidLoanException(f"Loan not found with ID: {loan_id}")
+        return stored_terms(loan_id, row)
+
+    def calculate_interest_amount(self, principal_amount: float,
+                                  interest_rate: float,
+                                  loan_term: int) -> float:
+        return LoanCalculator.interest_amount(principal_amount, interest_rate, loan_term)
+
+    async def loan_status(self, loan_id: int) -> str:
+        loan = await self.get_loan_by_id(loan_id)
+        if not loan:
+            raise InvalidLoanException(f"Loan not found with ID: {loan_id}")
+
+        min_score = self.credit_rules.get(loan.loan_type, self.credit_rules['default'])
+        status = "Approved" if loan.customer.credit_score > min_score else "Rejected"
+
+        try:
+            async with self._cursor() as (connection, cursor):
+                await cursor.execute(LOAN_STATUS_UPDATE, (status, loan_id))
+                await connection.commit()
+            if self.cache:
+                self.cache.invalidate(loan_id)
+
+            loan.loan_status = status
+            return status
+
+        except aiomysql.Error as e:
+            raise InvalidLoanException(f"Error updating loan status: {e}")
+
+    async def decide_loans(self, loan_status: str = "Pending", loan_type: str = None,
+                           loan_ids: List[int] = None,
+                           loan_id_range: Tuple[int, int] = None) -> dict:
+        if loan_ids is not None and not loan_ids:
+            return {'Approved': 0, 'Rejected': 0}
+        count_sql, update_sql, params = decide_loans_sql(
+            self.credit_rules, loan_status, loan_type, loan_ids, loan_id_range)
+
+        try:
+            async with self._cursor() as (connection, cursor):
+                await cursor.execute(count_sql, params)
+                approved, total = await cursor.fetchone()
+                await cursor.execute(update_sql, params)
+                await connection.commit()
+            if self.cache:
+                self.cache.clear()
+
+            approved = int(approved)
+            return {'Approved': approved, 'Rejected': total - approved}
+
+        except aiomysql.Error as e:
+            raise InvalidLoanException(f"Error updating loan status: {e}")
+
+    async def calculate_emi(self, loan_id: int) -> float:
+        return (await self._stored_terms(loan_id))[0]
+
+    def calculate_emi_amount(self, principal_amount: float,
+                             interest_rate: float,
+                             loan_term: int) -> float:
+        return LoanCalculator.emi_amount(principal_amount, interest_rate, loan_term)
+
+    async def change_loan_terms(self, loan_id: int, interest_rate: float = None,
+                                loan_term: int = None) -> None:
+        try:
+            async with self._cursor() as (connection, cursor):
+                await cursor.execute(LOAN_TERMS_SELECT + " FOR UPDATE", (loan_id,))
+                row = await cursor.fetchone()
+                if not row:
+                    raise InvalidLoanException(f"Loan not found with ID: {loan_id}")
+                await cursor.execute(LOAN_TERMS_UPDATE,
+                                     terms_update_params(loan_id, row, interest_rate, loan_term))
+                await connection.commit()
+            if self.cache:
+                self.cache.invalidate(loan_id)
+
+        except aiomysql.Error as e:
+            raise InvalidLoanException(f"Error changing loan terms: {e}")
+
+    async def backfill_loan_terms(self, batch_size: int = 10000) -> int:
+        filled = 0
+        last_loan_id = 0
+        try:
+            while True:
+                async with self._cursor() as (connection, cursor):
+                    await cursor.execute(LOAN_TERMS_MISSING, (last_loan_id, batch_size))
+                    rows = await cursor.fetchall()
+                    if not rows:
+                        return filled
+                    params = fill_params(rows)
+                    if params:
+                        await cursor.executemany(LOAN_TERMS_FILL, params)
+                    await connection.commit()
+                filled += len(params)
+                last_loan_id = rows[-1][0]
+        except aiomysql.Error as e:
+            raise InvalidLoanException(f"Error backfilling loan terms: {e}")
+
+    async def loan_repayment(self, loan_id: int, amount: float) -> None:
+        payment = PaymentPosting.repayment(loan_id, amount)
+        PaymentPosting.report_repayment(payment, await self.post_payments([payment]))
+
+    async def post_payments(self, payments: Iterable[Payment],
+                            batch_size: int = 1000) -> dict:
+        return await PaymentPosting.post_async(payments, batch_size, self._write_payments,
+                                               aiomysql.Error)
+
+    async def _write_payments(self, batch: List[Payment]) -> Tuple[list, list, int]:
+        async with self._cursor() as (connection, cursor):
+            references = [payment.payment_reference for payment in batch]
+            await cursor.execute(posted_references_sql(len(references)), references)
+            posted_before = {row[0] for row in await cursor.fetchall()}
+            fresh = [payment for payment in batch
+                     if payment.payment_reference not in posted_before]
+
+            loans = {}
+            if fresh:
+                loan_ids = sorted({payment.loan_id for payment in fresh})
+                await cursor.execute(posting_state_sql(len(loan_ids)) + " FOR UPDATE",
+                                     loan_ids)
+                loans = posting_state(await cursor.fetchall())
+            posted, rejected = PaymentPosting.allocate(fresh, loans)
+
+            if posted:
+                await cursor.executemany(PAYMENT_INSERT, payment_params(posted))
+                touched = sorted({payment.loan_id for payment in posted})
+                await cursor.executemany(LOAN_BALANCE_UPDATE, balance_params(loans, touched))
+            await connection.commit()
+        return posted, rejected, len(batch) - len(fresh)
+
+    async def get_payments(self, loan_id: int) -> List[Payment]:
+        try:
+            async with self._cursor() as (connection, cursor):
+                await cursor.execute(PAYMENTS_BY_LOAN_SELECT, (loan_id,))
+                rows = await cursor.fetchall()
+        except aiomysql.Error as e:
+            raise InvalidLoanException(f"Error retrieving payments: {e}")
+        return [build_payment(row) for row in rows]
+
+    async def get_all_loans(self) -> List[Loan]:
+        try:
+            async with self._cursor(dictionary=True) as (connection, cursor):
+                await cursor.execute(LOAN_SELECT)
+                rows = await cursor.fetchall()
+        except aiomysql.Error as e:
+            raise InvalidLoanException(f"Error retrieving loans: {e}")
+
+        customers = {}
+        return [build_loan(row, customers) for row in rows]
+
+    async def iter_loans(self, batch_size: int = 1000,
+                         after_loan_id: int = 0) -> AsyncIterator[Loan]:
+        while True:
+            try:
+                async with self._cursor(dictionary=True) as (connection, cursor):
+                    await cursor.execute(LOAN_PAGE_SELECT, (after_loan_id, batch_size))
+                    rows = await cursor.fetchall()
+            except aiomysql.Error as e:
+                raise InvalidLoanException(f"Error retrieving loans: {e}")
+
+            customers = {}
+            for row in rows:
+                yield build_loan(row, customers)
+
+            if len(rows) < batch_size:
+                return
+            after_loan_id = rows[-1]['loan_id']
+
+    async def iter_loan_rows(self, fetch_size: int = 10000) -> AsyncIterator[List[tuple]]:
+        # SSCursor streams the result from the server instead of buffering it.
+        try:
+            pool = await self._get_pool()
+            async with pool.acquire() as connection:
+                async with connection.cursor(aiomysql.SSCursor) as cursor:
+                    await cursor.execute(LOAN_SELECT + " ORDER BY l.loan_id")
+                    while True:
+                        rows = await cursor.fetchmany(fetch_size)
+                        if not rows:
+                            break
+                        yield rows
+                await connection.rollback()
+        except aiomysql.Error as e:
+            raise InvalidLoanException(f"Error retrieving loans: {e}")
+
+    async def get_loan_columns(self, loan_status: str = None,
+                               fetch_size: int = 10000) -> dict:
+        columns = new_loan_columns()
+        query, params = loan_columns_sql(loan_status)
+        try:
+            async with self._cursor() as (connection, cursor):
+                await cursor.execute(query, params)
+                while True:
+                    rows = await cursor.fetchmany(fetch_size)
+                    if not rows:
+                        break
+                    extend_loan_columns(columns, rows)
+        except aiomysql.Error as e:
+            raise InvalidLoanException(f"Error retrieving loans: {e}")
+
+        return columns
+
+    async def get_loan_frame(self, loan_status: str = None,
+                             fetch_size: int = 10000) -> LoanFrame:
+        frame = LoanFrame()
+        query, params = loan_frame_sql(loan_status)
+        try:
+            async with self._cursor(dictionary=True) as (connection, cursor):
+                await cursor.execute(query, params)
+                while True:
+                    rows = await cursor.fetchmany(fetch_size)
+                    if not rows:
+                        break
+                    frame.extend(rows)
+        except aiomysql.Error as e:
+            raise InvalidLoanException(f"Error retrieving loans: {e}")
+
+        return frame
+
+    async def get_loan_by_id(self, loan_id: int) -> Loan:
+        # The cache holds rows, not Loans: every caller gets its own Loan to
+        # read or change, as it would from the database.
+        if self.cache:
+            row = self.cache.get(loan_id)
+            if row is not None:
+                return build_loan(row)
+
+        try:
+            async with self._cursor(dictionary=True) as (connection, cursor):
+                await cursor.execute(LOAN_BY_ID_SELECT, (loan_id,))
+                row = await cursor.fetchone()
+        except aiomysql.Error as e:
+            raise InvalidLoanException(f"Error retrieving loan: {e}")
+
+        if not row:
+            return None
+
+        if self.cache:
+            self.cache.put(loan_id, dict(row), row['customer_id'])
+        return build_loan(row)
+
+    async def get_portfolio_summary(self) -> dict:
+        try:
+            async with self._cursor() as (connection, cursor):
+                await cursor.execute(PORTFOLIO_GROUPS)
+                rows = await cursor.fetchall()
+        except aiomysql.Error as e:
+            raise InvalidLoanException(f"Error summarizing loans: {e}")
+        return PortfolioSummary.summarize(rows)
+
+    async def find_loans(self, filters: dict = None, order_by: str = "loan_id",
+                         limit: int = None) -> List[Loan]:
+        query, params = find_loans_sql(filters, order_by, limit)
+        try:
+            async with self._cursor(dictionary=True) as (connection, cursor):
+                await cursor.execute(query, params)
+                rows = await cursor.fetchall()
+        except aiomysql.Error as e:
+            raise InvalidLoanException(f"Error retrieving loans: {e}")
+
+        customers = {}
+        return [build_loan(row, customers) for row in rows]
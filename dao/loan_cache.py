@@ -0,0 +1,76 @@
+import threading
+import time
+from collections import OrderedDict
+
+# LRU cache with a per-entry time-to-live for loans read by id. Writers call
+# invalidate() for the loans they touch, and invalidate_customer() when they
+# write a customer row, since every cached loan carries its customer's
+# details; the counters let callers judge whether the configured size and
+# TTL fit their access pattern.
+class LoanCache:
+    def __init__(self, max_entries=10000, ttl_seconds=300):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        # customer_id -> loan_ids cached for that customer.
+        self._by_customer = {}
+        self._lock = threading.Lock()
+
+    def get(self, loan_id):
+        with self._lock:
+            entry = self._entries.get(loan_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            loan, customer_id, expires_at = entry
+            if expires_at < time.monotonic():
+                self._remove(loan_id)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(loan_id)
+            self.hits += 1
+            return loan
+
+    def put(self, loan_id, loan, customer_id=None):
+        with self._lock:
+            self._remove(loan_id)
+            self._entries[loan_id] = (loan, customer_id, time.monotonic() + self.ttl_seconds)
+            if customer_id is not None:
+                self._by_customer.setdefault(customer_id, set()).add(loan_id)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, loan_id):
+        with self._lock:
+            self._remove(loan_id)
+
+    def invalidate_customer(self, customer_id):
+        with self._lock:
+            for loan_id in self._by_customer.pop(customer_id, ()):
+                self._entries.pop(loan_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_customer.clear()
+
+    def _remove(self, loan_id):
+        entry = self._entries.pop(loan_id, None)
+        if entry is not None and entry[1] is not None:
+            loan_ids = self._by_customer[entry[1]]
+            loan_ids.discard(loan_id)
+            if not loan_ids:
+                del self._by_customer[entry[1]]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
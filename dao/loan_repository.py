@@ -1,5 +1,8 @@
 from abc import ABC, abstractmethod
+from typing import Iterable, Iterator, List, Tuple
 from entities.loan import Loan
+from entities.loan_frame import LoanFrame
+from entities.payment import Payment
 from exceptions.invalid_loan_exception import InvalidLoanException
 
 class ILoanRepository(ABC):
@@ -7,6 +10,11 @@ class ILoanRepository(ABC):
     def apply_loan(self, loan: Loan) -> None:
         pass
     
+    @abstractmethod
+    def apply_loans(self, loans: Iterable[Loan],
+                    batch_size: int = 500) -> List[Tuple[Loan, str]]:
+        pass
+    
     @abstractmethod
     def calculate_interest(self, loan_id: int) -> float:
         pass
@@ -21,6 +29,12 @@ class ILoanRepository(ABC):
     def loan_status(self, loan_id: int) -> str:
         pass
     
+    @abstractmethod
+    def decide_loans(self, loan_status: str = "Pending", loan_type: str = None,
+                     loan_ids: List[int] = None,
+                     loan_id_range: Tuple[int, int] = None) -> dict:
+        pass
+    
     @abstractmethod
     def calculate_emi(self, loan_id: int) -> float:
         pass
@@ -31,14 +45,60 @@ class ILoanRepository(ABC):
                           loan_term: int) -> float:
         pass
     
+    @abstractmethod
+    def change_loan_terms(self, loan_id: int, interest_rate: float = None,
+                          loan_term: int = None) -> None:
+        pass
+    
+    @abstractmethod
+    def backfill_loan_terms(self, batch_size: int = 10000) -> int:
+        pass
+    
     @abstractmethod
     def loan_repayment(self, loan_id: int, amount: float) -> None:
         pass
     
+    @abstractmethod
+    def post_payments(self, payments: Iterable[Payment],
+                      batch_size: int = 1000) -> dict:
+        pass
+    
+    @abstractmethod
+    def get_payments(self, loan_id: int) -> List[Payment]:
+        pass
+    
     @abstractmethod
     def get_all_loans(self) -> list[Loan]:
         pass
     
+    @abstractmethod
+    def iter_loan_rows(self, fetch_size: int = 10000) -> Iterator[List[tuple]]:
+        pass
+    
+    @abstractmethod
+    def get_loan_columns(self, loan_status: str = None,
+                         fetch_size: int = 10000) -> dict:
+        pass
+    
+    @abstractmethod
+    def get_loan_frame(self, loan_status: str = None,
+                       fetch_size: int = 10000) -> LoanFrame:
+        pass
+    
     @abstractmethod
     def get_loan_by_id(self, loan_id: int) -> Loan:
+        pass
+    
+    @abstractmethod
+    def get_portfolio_summary(self) -> dict:
+        pass
+    
+    @abstractmethod
+    def find_loans(self, filters: dict = None, order_by: str = "loan_id",
+                   limit: int = None) -> List[Loan]:
+        pass
+    
+    @abstractmethod
+    def iter_loans(self, batch_size: int = 1000,
+                   after_loan_id: int = 0) -> Iterator[Loan]:
         pass
\ No newline at end of file
@@ -0,0 +1,20 @@
+from dao.loan_repository import ILoanRepository
+from util.db_property_util import DBPropertyUtil
+
+class LoanRepositoryFactory:
+    @staticmethod
+    def create(property_file="config.ini") -> ILoanRepository:
+        # Backends are imported on demand so the embedded ones work on a
+        # machine without the MySQL driver installed.
+        settings = DBPropertyUtil.get_backend_settings(property_file)
+        backend = settings['backend']
+        if backend == 'mysql':
+            from dao.loan_repository_impl import ILoanRepositoryImpl
+            return ILoanRepositoryImpl(property_file)
+        if backend == 'sqlite':
+            from dao.sqlite_loan_repository_impl import SQLiteLoanRepositoryImpl
+            return SQLiteLoanRepositoryImpl(settings['sqlite_path'], property_file)
+        if backend == 'memory':
+            from dao.memory_loan_repository_impl import InMemoryLoanRepositoryImpl
+            return InMemoryLoanRepositoryImpl(property_file)
+        raise ValueError(f"Unknown database backend: {backend}")
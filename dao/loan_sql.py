@@ -0,0 +1,485 @@
+from typing import List
+from entities.customer import Customer
+from entities.loan import Loan
+from entities.home_loan import HomeLoan
+from entities.car_loan import CarLoan
+from entities.payment import Payment
+from exceptions.invalid_loan_exception import InvalidLoanException
+from util.loan_calculator import LoanCalculator
+
+# SQL and row mapping shared by the sync and async MySQL repositories.
+
+# Subtype columns come in through LEFT JOINs so a listing is a single query
+# instead of one extra HomeLoan/CarLoan lookup per row.
+LOAN_SELECT = """
+    SELECT l.loan_id, l.customer_id, l.principal_amount, l.interest_rate,
+           l.loan_term, l.loan_type, l.loan_status,
+           c.name, c.email_address, c.phone_number, c.address, c.credit_score,
+           h.property_address, h.property_value,
+           cl.car_model, cl.car_value
+    FROM Loan l
+    JOIN Customer c ON l.customer_id = c.customer_id
+    LEFT JOIN HomeLoan h ON h.loan_id = l.loan_id
+    LEFT JOIN CarLoan cl ON cl.loan_id = l.loan_id
+"""
+
+LOAN_SELECT_COLUMNS = ('loan_id', 'customer_id', 'principal_amount', 'interest_rate',
+                       'loan_term', 'loan_type', 'loan_status', 'name', 'email_address',
+                       'phone_number', 'address', 'credit_score', 'property_address',
+                       'property_value', 'car_model', 'car_value')
+
+# Keyset page of LOAN_SELECT rows: loans after a loan_id, in loan_id order.
+LOAN_PAGE_SELECT = LOAN_SELECT + """
+    WHERE l.loan_id > %s
+    ORDER BY l.loan_id
+    LIMIT %s
+"""
+
+LOAN_BY_ID_SELECT = LOAN_SELECT + """
+    WHERE l.loan_id = %s
+"""
+
+LOAN_STATUS_UPDATE = """
+    UPDATE Loan SET loan_status = %s WHERE loan_id = %s
+"""
+
+
+def loan_columns_sql(loan_status=None):
+    # get_loan_columns: the four calculator inputs, optionally of one status.
+    query = "SELECT loan_id, principal_amount, interest_rate, loan_term FROM Loan"
+    if loan_status is None:
+        return query, ()
+    return query + " WHERE loan_status = %s", (loan_status,)
+
+
+def new_loan_columns() -> dict:
+    return {
+        'loan_id': [],
+        'principal_amount': [],
+        'interest_rate': [],
+        'loan_term': []
+    }
+
+
+def extend_loan_columns(columns: dict, rows) -> None:
+    for loan_id, principal_amount, interest_rate, loan_term in rows:
+        columns['loan_id'].append(loan_id)
+        columns['principal_amount'].append(float(principal_amount))
+        columns['interest_rate'].append(float(interest_rate))
+        columns['loan_term'].append(loan_term)
+
+
+def loan_frame_sql(loan_status=None):
+    # get_loan_frame: LOAN_SELECT rows, optionally of one status.
+    if loan_status is None:
+        return LOAN_SELECT, ()
+    return LOAN_SELECT + " WHERE l.loan_status = %s", (loan_status,)
+
+
+CUSTOMER_UPSERT = """
+    INSERT INTO Customer (customer_id, name, email_address, phone_number, address, credit_score)
+    VALUES (%s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+    name = VALUES(name),
+    email_address = VALUES(email_address),
+    phone_number = VALUES(phone_number),
+    address = VALUES(address),
+    credit_score = VALUES(credit_score)
+"""
+
+LOAN_INSERT = """
+    INSERT INTO Loan (loan_id, customer_id, principal_amount, interest_rate, loan_term, loan_type, loan_status,
+                      outstanding_balance, remaining_emis, emi_amount, total_interest, total_payable)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+HOME_LOAN_INSERT = """
+    INSERT INTO HomeLoan (loan_id, property_address, property_value)
+    VALUES (%s, %s, %s)
+"""
+
+CAR_LOAN_INSERT = """
+    INSERT INTO CarLoan (loan_id, car_model, car_value)
+    VALUES (%s, %s, %s)
+"""
+
+
+def build_loan(row, customers: dict = None) -> Loan:
+    # When a customers dict is passed, one Customer object is shared by all
+    # loans of the same customer_id instead of one copy per loan row.
+    customer = customers.get(row['customer_id']) if customers is not None else None
+    if customer is None:
+        customer = Customer(
+            customer_id=row['customer_id'],
+            name=row['name'],
+            email_address=row['email_address'],
+            phone_number=row['phone_number'],
+            address=row['address'],
+            credit_score=row['credit_score']
+        )
+        if customers is not None:
+            customers[row['customer_id']] = customer
+    
+    if row['loan_type'] == "HomeLoan":
+        return HomeLoan(
+            loan_id=row['loan_id'],
+            customer=customer,
+            principal_amount=row['principal_amount'],
+            interest_rate=row['interest_rate'],
+            loan_term=row['loan_term'],
+            loan_status=row['loan_status'],
+            property_address=row['property_address'],
+            property_value=row['property_value']
+        )
+    elif row['loan_type'] == "CarLoan":
+        return CarLoan(
+            loan_id=row['loan_id'],
+            customer=customer,
+            principal_amount=row['principal_amount'],
+            interest_rate=row['interest_rate'],
+            loan_term=row['loan_term'],
+            loan_status=row['loan_status'],
+            car_model=row['car_model'],
+            car_value=row['car_value']
+        )
+    return Loan(
+        loan_id=row['loan_id'],
+        customer=customer,
+        principal_amount=row['principal_amount'],
+        interest_rate=row['interest_rate'],
+        loan_term=row['loan_term'],
+        loan_type=row['loan_type'],
+        loan_status=row['loan_status']
+    )
+
+
+def insert_params(loans: List[Loan]):
+    customers = [(
+        loan.customer.customer_id,
+        loan.customer.name,
+        loan.customer.email_address,
+        loan.customer.phone_number,
+        loan.customer.address,
+        loan.customer.credit_score
+    ) for loan in loans]
+    
+    base_loans = [(
+        loan.loan_id,
+        loan.customer.customer_id,
+        loan.principal_amount,
+        loan.interest_rate,
+        loan.loan_term,
+        loan.loan_type,
+        loan.loan_status,
+        loan.principal_amount,
+        loan.loan_term,
+        *repayment_terms(loan.loan_id, loan.principal_amount, loan.interest_rate,
+                         loan.loan_term)
+    ) for loan in loans]
+    
+    home_loans = [(
+        loan.loan_id,
+        loan.property_address,
+        loan.property_value
+    ) for loan in loans if isinstance(loan, HomeLoan)]
+    
+    car_loans = [(
+        loan.loan_id,
+        loan.car_model,
+        loan.car_value
+    ) for loan in loans if isinstance(loan, CarLoan)]
+    
+    return customers, base_loans, home_loans, car_loans
+
+
+# True when the customer's credit score clears the minimum for the loan's
+# type; the three placeholders take credit_rules_params().
+APPROVE_CONDITION = """
+    c.credit_score > CASE l.loan_type
+        WHEN 'HomeLoan' THEN %s
+        WHEN 'CarLoan' THEN %s
+        ELSE %s
+    END
+"""
+
+
+def credit_rules_params(credit_rules):
+    return [credit_rules['HomeLoan'], credit_rules['CarLoan'], credit_rules['default']]
+
+
+def decide_filters(loan_status=None, loan_type=None, loan_ids=None, loan_id_range=None):
+    conditions = []
+    params = []
+    if loan_status is not None:
+        conditions.append("l.loan_status = %s")
+        params.append(loan_status)
+    if loan_type is not None:
+        conditions.append("l.loan_type = %s")
+        params.append(loan_type)
+    if loan_ids is not None:
+        conditions.append(f"l.loan_id IN ({', '.join(['%s'] * len(loan_ids))})")
+        params.extend(loan_ids)
+    if loan_id_range is not None:
+        # Inclusive (first, last), served by the primary key.
+        conditions.append("l.loan_id BETWEEN %s AND %s")
+        params.extend(loan_id_range)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return where, params
+
+
+def decide_loans_sql(credit_rules, loan_status=None, loan_type=None, loan_ids=None,
+                     loan_id_range=None):
+    # Re-scoring is two statements run in one transaction: a locking count
+    # of the outcome, then a single set-based UPDATE applying the same rule.
+    where, filter_params = decide_filters(loan_status, loan_type, loan_ids, loan_id_range)
+    params = credit_rules_params(credit_rules) + filter_params
+    
+    count_sql = f"""
+        SELECT COALESCE(SUM({APPROVE_CONDITION}), 0), COUNT(*)
+        FROM Loan l JOIN Customer c ON l.customer_id = c.customer_id
+        {where}
+        FOR UPDATE
+    """
+    update_sql = f"""
+        UPDATE Loan l JOIN Customer c ON l.customer_id = c.customer_id
+        SET l.loan_status = CASE WHEN {APPROVE_CONDITION} THEN 'Approved' ELSE 'Rejected' END
+        {where}
+    """
+    return count_sql, update_sql, params
+
+
+# Predicates find_loans can push down, keyed by filter name. They are
+# served by the indexes in db/migrations/001_loan_search_indexes.sql.
+FIND_FILTERS = {
+    'customer_id': "l.customer_id = %s",
+    'loan_status': "l.loan_status = %s",
+    'loan_type': "l.loan_type = %s",
+    'min_principal': "l.principal_amount >= %s",
+    'max_principal': "l.principal_amount <= %s"
+}
+
+FIND_ORDER_COLUMNS = ('loan_id', 'customer_id', 'principal_amount', 'interest_rate', 'loan_term')
+
+
+def find_order(order_by="loan_id"):
+    # "principal_amount" sorts ascending, "-principal_amount" descending.
+    # Returns (column, descending); loan_id breaks ties so paging is stable.
+    column = order_by.lstrip("-")
+    if column not in FIND_ORDER_COLUMNS:
+        raise ValueError(f"Cannot order loans by: {order_by}")
+    return column, order_by.startswith("-")
+
+
+def find_loans_sql(filters: dict = None, order_by: str = "loan_id", limit: int = None):
+    filters = filters or {}
+    unknown = set(filters) - set(FIND_FILTERS)
+    if unknown:
+        raise ValueError(f"Unknown loan filter: {', '.join(sorted(unknown))}")
+    
+    conditions = []
+    params = []
+    for name, value in filters.items():
+        if value is not None:
+            conditions.append(FIND_FILTERS[name])
+            params.append(value)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    
+    column, descending = find_order(order_by)
+    direction = "DESC" if descending else "ASC"
+    order = f"ORDER BY l.{column} {direction}"
+    if column != 'loan_id':
+        order += f", l.loan_id {direction}"
+    
+    query = f"{LOAN_SELECT} {where} {order}"
+    if limit is not None:
+        query += " LIMIT %s"
+        params.append(limit)
+    return query, params
+
+
+# One row per (loan_type, loan_status): loans, principal, sum of rates,
+# projected interest (simple interest over the full term, as in
+# LoanCalculator.interest_amount) and outstanding balance. PortfolioSummary
+# folds these into totals.
+PORTFOLIO_GROUPS = """
+    SELECT loan_type, loan_status, COUNT(*), SUM(principal_amount), SUM(interest_rate),
+           SUM(principal_amount * interest_rate * loan_term) / 1200,
+           SUM(COALESCE(outstanding_balance, principal_amount))
+    FROM Loan
+    GROUP BY loan_type, loan_status
+"""
+
+
+PAYMENT_INSERT = """
+    INSERT INTO Payment (payment_reference, loan_id, amount, payment_date, emis_paid,
+                         principal_paid, interest_paid, outstanding_balance, remaining_emis)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+LOAN_BALANCE_UPDATE = """
+    UPDATE Loan SET outstanding_balance = %s, remaining_emis = %s WHERE loan_id = %s
+"""
+
+# The stored repayment terms. Rows written before they existed read as NULL
+# until backfilled, and stored_terms() computes those on the fly.
+LOAN_TERMS_SELECT = """
+    SELECT principal_amount, interest_rate, loan_term, emi_amount, total_interest,
+           COALESCE(outstanding_balance, principal_amount), COALESCE(remaining_emis, loan_term)
+    FROM Loan
+    WHERE loan_id = %s
+"""
+
+LOAN_TERMS_MISSING = """
+    SELECT loan_id, principal_amount, interest_rate, loan_term
+    FROM Loan
+    WHERE emi_amount IS NULL AND loan_id > %s
+    ORDER BY loan_id
+    LIMIT %s
+"""
+
+LOAN_TERMS_FILL = """
+    UPDATE Loan SET emi_amount = %s, total_interest = %s, total_payable = %s WHERE loan_id = %s
+"""
+
+# Rate and term only ever change together with the terms derived from them.
+LOAN_TERMS_UPDATE = """
+    UPDATE Loan
+    SET interest_rate = %s, loan_term = %s, remaining_emis = %s,
+        emi_amount = %s, total_interest = %s, total_payable = %s
+    WHERE loan_id = %s
+"""
+
+PAYMENT_SELECT = """
+    SELECT payment_reference, loan_id, amount, payment_date, emis_paid,
+           principal_paid, interest_paid, outstanding_balance, remaining_emis
+    FROM Payment
+"""
+
+PAYMENTS_BY_LOAN_SELECT = PAYMENT_SELECT + """
+    WHERE loan_id = %s
+    ORDER BY remaining_emis DESC
+"""
+
+
+def posted_references_sql(count):
+    return f"""
+        SELECT payment_reference FROM Payment
+        WHERE payment_reference IN ({', '.join(['%s'] * count)})
+    """
+
+
+def posting_state_sql(count):
+    # Loans written before the ledger existed may have no balance yet; they
+    # start from the full principal and term. emi_amount is NULL until the
+    # terms backfill has run, and posting_state() then computes it.
+    return f"""
+        SELECT loan_id, loan_type, loan_status, principal_amount, interest_rate, loan_term,
+               COALESCE(outstanding_balance, principal_amount),
+               COALESCE(remaining_emis, loan_term),
+               emi_amount
+        FROM Loan
+        WHERE loan_id IN ({', '.join(['%s'] * count)})
+        ORDER BY loan_id
+    """
+
+
+def posting_state(rows) -> dict:
+    return {row[0]: {
+        'loan_type': row[1],
+        'loan_status': row[2],
+        'principal_amount': float(row[3]),
+        'interest_rate': float(row[4]),
+        'loan_term': row[5],
+        'outstanding_balance': float(row[6]),
+        'remaining_emis': row[7],
+        'emi': stored_emi(row[8], row[3], row[4], row[5])
+    } for row in rows}
+
+
+def stored_emi(emi_amount, principal_amount, interest_rate, loan_term):
+    # The EMI as calculate_emi reports it, so a customer paying exactly the
+    # EMI they were shown covers one EMI. None for terms no EMI exists for.
+    if emi_amount is None:
+        try:
+            return repayment_terms(None, principal_amount, interest_rate, loan_term)[0]
+        except InvalidLoanException:
+            return None
+    return float(emi_amount)
+
+
+def payment_params(payments) -> list:
+    return [(
+        payment.payment_reference,
+        payment.loan_id,
+        payment.amount,
+        payment.payment_date,
+        payment.emis_paid,
+        payment.principal_paid,
+        payment.interest_paid,
+        payment.outstanding_balance,
+        payment.remaining_emis
+    ) for payment in payments]
+
+
+def balance_params(loans: dict, loan_ids) -> list:
+    return [(loans[loan_id]['outstanding_balance'], loans[loan_id]['remaining_emis'], loan_id)
+            for loan_id in loan_ids]
+
+
+def repayment_terms(loan_id, principal_amount, interest_rate, loan_term):
+    # LoanCalculator.repayment_terms, with terms the formulas cannot handle
+    # (a zero term, a missing amount) reported as InvalidLoanException so
+    # batch writers fail only that loan.
+    try:
+        if loan_term <= 0:
+            raise ValueError(loan_term)
+        return LoanCalculator.repayment_terms(float(principal_amount), float(interest_rate),
+                                              loan_term)
+    except (TypeError, ValueError, ArithmeticError):
+        raise InvalidLoanException(f"Invalid terms for loan {loan_id}: principal "
+                                   f"{principal_amount}, rate {interest_rate}, term {loan_term}")
+
+
+def stored_terms(loan_id, row):
+    # (emi_amount, total_interest) from a LOAN_TERMS_SELECT row.
+    principal_amount, interest_rate, loan_term, emi_amount, total_interest = row[:5]
+    if emi_amount is None:
+        emi_amount, total_interest, _ = repayment_terms(loan_id, principal_amount,
+                                                        interest_rate, loan_term)
+    return float(emi_amount), float(total_interest)
+
+
+def fill_params(rows) -> list:
+    # LOAN_TERMS_FILL parameters for LOAN_TERMS_MISSING rows. Rows with
+    # invalid terms are left NULL, and reading their terms raises.
+    params = []
+    for loan_id, principal_amount, interest_rate, loan_term in rows:
+        try:
+            params.append((*repayment_terms(loan_id, principal_amount, interest_rate, loan_term),
+                           loan_id))
+        except InvalidLoanException:
+            continue
+    return params
+
+
+def terms_update_params(loan_id, row, interest_rate=None, loan_term=None):
+    # LOAN_TERMS_UPDATE parameters for a change of rate and/or term, from
+    # the loan's LOAN_TERMS_SELECT row. Once a payment has been posted the
+    # schedule is under way and the terms can no longer change.
+    principal_amount, current_rate, current_term = row[:3]
+    outstanding_balance, remaining_emis = row[5:7]
+    if float(outstanding_balance) != float(principal_amount) or remaining_emis != current_term:
+        raise InvalidLoanException(
+            f"Loan {loan_id} has payments posted; its terms cannot be changed.")
+    interest_rate = float(current_rate if interest_rate is None else interest_rate)
+    loan_term = current_term if loan_term is None else loan_term
+    if interest_rate < 0:
+        raise InvalidLoanException(f"Invalid terms for loan {loan_id}: "
+                                   f"rate {interest_rate}, term {loan_term}")
+    return (interest_rate, loan_term, loan_term,
+            *repayment_terms(loan_id, principal_amount, interest_rate, loan_term),
+            loan_id)
+
+
+def build_payment(row) -> Payment:
+    return Payment(*row)
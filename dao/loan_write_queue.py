@@ -0,0 +1,162 @@
+import atexit
+import functools
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Tuple
+from entities.loan import Loan
+from exceptions.invalid_loan_exception import InvalidLoanException
+
+DURABILITY_MODES = ('commit', 'enqueue')
+
+_CLOSE = (None, None)
+
+_log = logging.getLogger(__name__)
+
+
+# Write-behind for loan applications. submit() puts a loan on a bounded
+# queue and returns a Future at once; a single writer thread takes what
+# has queued up, up to batch_size loans, and writes it with apply_loans, so
+# loans that arrive while the previous batch commits share one transaction
+# and one commit. The writer commits as soon as the queue runs empty. With
+# a max_delay it also lingers that long after the first loan while loans
+# keep arriving, which only pays off for producers that do not wait on
+# their futures. Each future resolves to the loan_id once its batch has
+# committed, or raises InvalidLoanException with the reason that loan was
+# rejected; the rest of its batch still goes in.
+#
+# A full queue makes submit() wait up to full_queue_timeout seconds (None:
+# until there is room) and then raise, which pushes back on the callers
+# rather than growing without bound. Loans still queued at interpreter
+# exit are written by close(); loans queued when the process dies are
+# lost, which is what 'enqueue' durability accepts. With 'enqueue' nobody
+# waits on the future, so a loan the batch rejects is logged as an error
+# and counted in failed instead.
+class LoanWriteQueue:
+    def __init__(self, loan_repo, max_pending=10000, batch_size=500, max_delay=0,
+                 full_queue_timeout=None, durability='commit'):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown write-behind durability: {durability}")
+        self.loan_repo = loan_repo
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.full_queue_timeout = full_queue_timeout
+        self.durability = durability
+        self._queue = queue.Queue(max_pending)
+        self._lock = threading.Lock()
+        self._closed = False
+        self.failed = 0
+        # Separate from _lock, which submit() holds while it waits for room
+        # and the writer thread, which runs the callbacks, must never need.
+        self._failed_lock = threading.Lock()
+        self._writer = threading.Thread(target=self._run, name="loan-write-queue", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    @staticmethod
+    def from_settings(loan_repo, settings):
+        return LoanWriteQueue(loan_repo, settings['max_pending'], settings['batch_size'],
+                              settings['max_delay'], settings['full_queue_timeout'],
+                              settings['durability'])
+
+    def submit(self, loan: Loan) -> Future:
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise InvalidLoanException("Loan write queue is closed")
+            try:
+                self._queue.put((loan, future), timeout=self.full_queue_timeout)
+            except queue.Full:
+                raise InvalidLoanException("Loan write queue is full; try again later")
+        return future
+
+    def apply(self, loan: Loan) -> bool:
+        # Submits and acknowledges according to durability: True once the
+        # loan is committed, False as soon as it is queued.
+        future = self.submit(loan)
+        if self.durability == 'enqueue':
+            future.add_done_callback(functools.partial(self._report_failure, loan))
+            return False
+        future.result()
+        return True
+
+    def _report_failure(self, loan: Loan, future: Future) -> None:
+        if future.cancelled() or future.exception() is None:
+            return
+        with self._failed_lock:
+            self.failed += 1
+        _log.error("Queued loan %s was not applied: %s", loan.loan_id, future.exception())
+
+    def flush(self) -> None:
+        # Returns once everything submitted so far has been written.
+        self._queue.join()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_CLOSE)
+        self._writer.join()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_delay
+            arrived = False
+            while len(batch) < self.batch_size and batch[-1] is not _CLOSE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                    arrived = True
+                    continue
+                except queue.Empty:
+                    pass
+                # The queue is empty. Commit now, unless loans arrived while
+                # it was being drained: more are then likely on the way, so
+                # wait for them, but no longer than max_delay in all.
+                remaining = deadline - time.monotonic()
+                if not arrived or remaining <= 0:
+                    break
+                arrived = False
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                    arrived = True
+                except queue.Empty:
+                    break
+
+            closing = batch[-1] is _CLOSE
+            entries = batch[:-1] if closing else batch
+            # A future cancelled while it was still queued is not written.
+            self._write([(loan, future) for loan, future in entries
+                         if future.set_running_or_notify_cancel()])
+            for _ in batch:
+                self._queue.task_done()
+            if closing:
+                return
+
+    def _write(self, entries: List[Tuple[Loan, Future]]) -> None:
+        if not entries:
+            return
+        try:
+            failures = self.loan_repo.apply_loans([loan for loan, _ in entries],
+                                                  batch_size=len(entries))
+        except Exception as e:
+            for _, future in entries:
+                future.set_exception(InvalidLoanException(f"Error applying for loan: {e}"))
+            return
+
+        # The same Loan object may be queued twice, e.g. by a caller retrying;
+        # its first write is the one that goes in, so failures are matched to
+        # the latest submissions of each object.
+        failed = {}
+        for loan, error in failures:
+            failed.setdefault(id(loan), []).append(error)
+        for loan, future in reversed(entries):
+            errors = failed.get(id(loan))
+            if errors:
+                future.set_exception(
+                    InvalidLoanException(f"Error applying for loan: {errors.pop()}"))
+            else:
+                future.set_result(loan.loan_id)
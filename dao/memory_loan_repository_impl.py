@@ -0,0 +1,323 @@
+import bisect
+import threading
+from typing import Iterable, Iterator, List, Tuple
+from dao.loan_repository import ILoanRepository
+from dao.loan_sql import (FIND_FILTERS, LOAN_SELECT_COLUMNS, build_loan, find_order,
+                          insert_params, terms_update_params)
+from dao.portfolio_summary import PortfolioSummary
+from entities.loan import Loan
+from entities.loan_frame import LoanFrame
+from entities.payment import Payment
+from exceptions.invalid_loan_exception import InvalidLoanException
+from util.db_property_util import DBPropertyUtil
+from util.loan_calculator import LoanCalculator
+from util.payment_posting import PaymentPosting
+
+CUSTOMER_COLUMNS = ('customer_id', 'name', 'email_address', 'phone_number',
+                    'address', 'credit_score')
+LOAN_COLUMNS = ('loan_id', 'customer_id', 'principal_amount', 'interest_rate',
+                'loan_term', 'loan_type', 'loan_status', 'outstanding_balance',
+                'remaining_emis', 'emi_amount', 'total_interest', 'total_payable')
+SUBTYPE_COLUMNS = ('property_address', 'property_value', 'car_model', 'car_value')
+
+
+# Pure in-memory ILoanRepository with no database at all. Rows are kept as
+# dictionaries shaped like the joined loan select, so callers get fresh
+# entities on every read exactly as with the SQL backends, and loan ids are
+# kept sorted for keyset pagination.
+class InMemoryLoanRepositoryImpl(ILoanRepository):
+    def __init__(self, property_file="config.ini"):
+        self.credit_rules = DBPropertyUtil.get_credit_rules(property_file)
+        self.customers = {}
+        self.loans = {}
+        self._loan_ids = []
+        self._loans_by_customer = {}
+        self.payments = {}
+        self._payments_by_loan = {}
+        self._lock = threading.RLock()
+
+    def apply_loan(self, loan: Loan) -> None:
+        confirmation = input("Confirm loan application (yes/no): ").lower()
+        if confirmation != 'yes':
+            print("Loan application cancelled.")
+            return
+
+        failures = self.apply_loans([loan])
+        if failures:
+            raise InvalidLoanException(f"Error applying for loan: {failures[0][1]}")
+        print("Loan application submitted successfully. Status: Pending")
+
+    def apply_loans(self, loans: Iterable[Loan],
+                    batch_size: int = 500) -> List[Tuple[Loan, str]]:
+        failures = []
+        with self._lock:
+            for loan in loans:
+                if loan.loan_id in self.loans:
+                    failures.append((loan, f"Duplicate loan ID: {loan.loan_id}"))
+                    continue
+                try:
+                    self._insert_loan(loan)
+                except InvalidLoanException as e:
+                    failures.append((loan, str(e)))
+        return failures
+
+    def _insert_loan(self, loan: Loan) -> None:
+        customers, base_loans, home_loans, car_loans = insert_params([loan])
+        customer = dict(zip(CUSTOMER_COLUMNS, customers[0]))
+        row = dict(zip(LOAN_COLUMNS, base_loans[0]))
+        row.update(dict.fromkeys(SUBTYPE_COLUMNS))
+        if home_loans:
+            row['property_address'], row['property_value'] = home_loans[0][1:]
+        if car_loans:
+            row['car_model'], row['car_value'] = car_loans[0][1:]
+
+        self.customers[customer['customer_id']] = customer
+        self.loans[row['loan_id']] = row
+        bisect.insort(self._loan_ids, row['loan_id'])
+        bisect.insort(self._loans_by_customer.setdefault(row['customer_id'], []), row['loan_id'])
+
+    def _joined(self, loan_id):
+        row = self.loans[loan_id]
+        return {**row, **self.customers[row['customer_id']]}
+
+    def calculate_interest(self, loan_id: int) -> float:
+        return self._row(loan_id)['total_interest']
+
+    def _row(self, loan_id):
+        row = self.loans.get(loan_id)
+        if row is None:
+            raise InvalidLoanException(f"Loan not found with ID: {loan_id}")
+        return row
+
+    def calculate_interest_amount(self, principal_amount: float,
+                                  interest_rate: float,
+                                  loan_term: int) -> float:
+        return LoanCalculator.interest_amount(principal_amount, interest_rate, loan_term)
+
+    def loan_status(self, loan_id: int) -> str:
+        with self._lock:
+            loan = self.get_loan_by_id(loan_id)
+            if not loan:
+                raise InvalidLoanException(f"Loan not found with ID: {loan_id}")
+
+            status = self._decide(self._joined(loan_id))
+            self.loans[loan_id]['loan_status'] = status
+            loan.loan_status = status
+            return status
+
+    def _decide(self, row) -> str:
+        min_score = self.credit_rules.get(row['loan_type'], self.credit_rules['default'])
+        credit_score = row['credit_score']
+        return "Approved" if credit_score is not None and credit_score > min_score else "Rejected"
+
+    def decide_loans(self, loan_status: str = "Pending", loan_type: str = None,
+                     loan_ids: List[int] = None,
+                     loan_id_range: Tuple[int, int] = None) -> dict:
+        counts = {'Approved': 0, 'Rejected': 0}
+        with self._lock:
+            candidates = self._loan_ids if loan_ids is None else set(loan_ids)
+            if loan_id_range is not None:
+                first_id, last_id = loan_id_range
+                if loan_ids is None:
+                    candidates = self._loan_ids[bisect.bisect_left(self._loan_ids, first_id):
+                                                bisect.bisect_right(self._loan_ids, last_id)]
+                else:
+                    candidates = [loan_id for loan_id in candidates
+                                  if first_id <= loan_id <= last_id]
+            for loan_id in candidates:
+                row = self.loans.get(loan_id)
+                if row is None:
+                    continue
+                if loan_status is not None and row['loan_status'] != loan_status:
+                    continue
+                if loan_type is not None and row['loan_type'] != loan_type:
+                    continue
+                status = self._decide(self._joined(loan_id))
+                row['loan_status'] = status
+                counts[status] += 1
+        return counts
+
+    def calculate_emi(self, loan_id: int) -> float:
+        return self._row(loan_id)['emi_amount']
+
+    def calculate_emi_amount(self, principal_amount: float,
+                             interest_rate: float,
+                             loan_term: int) -> float:
+        return LoanCalculator.emi_amount(principal_amount, interest_rate, loan_term)
+
+    def change_loan_terms(self, loan_id: int, interest_rate: float = None,
+                          loan_term: int = None) -> None:
+        with self._lock:
+            row = self._row(loan_id)
+            params = terms_update_params(loan_id, (
+                row['principal_amount'], row['interest_rate'], row['loan_term'],
+                row['emi_amount'], row['total_interest'],
+                row['outstanding_balance'], row['remaining_emis']
+            ), interest_rate, loan_term)
+            (row['interest_rate'], row['loan_term'], row['remaining_emis'],
+             row['emi_amount'], row['total_interest'], row['total_payable']) = params[:-1]
+
+    def backfill_loan_terms(self, batch_size: int = 10000) -> int:
+        # Every row gets its terms on insert; there is nothing to fill.
+        return 0
+
+    def loan_repayment(self, loan_id: int, amount: float) -> None:
+        payment = PaymentPosting.repayment(loan_id, amount)
+        PaymentPosting.report_repayment(payment, self.post_payments([payment]))
+
+    def post_payments(self, payments: Iterable[Payment],
+                      batch_size: int = 1000) -> dict:
+        return PaymentPosting.post(payments, batch_size, self._write_payments)
+
+    def _write_payments(self, batch: List[Payment]) -> Tuple[list, list, int]:
+        with self._lock:
+            fresh = [payment for payment in batch
+                     if payment.payment_reference not in self.payments]
+
+            loans = {}
+            for loan_id in {payment.loan_id for payment in fresh}:
+                row = self.loans.get(loan_id)
+                if row is not None:
+                    loans[loan_id] = {
+                        'principal_amount': float(row['principal_amount']),
+                        'interest_rate': float(row['interest_rate']),
+                        'loan_term': row['loan_term'],
+                        'outstanding_balance': float(row['outstanding_balance']),
+                        'remaining_emis': row['remaining_emis'],
+                        'emi': row['emi_amount']
+                    }
+            posted, rejected = PaymentPosting.allocate(fresh, loans)
+
+            for payment in posted:
+                self.payments[payment.payment_reference] = payment
+                self._payments_by_loan.setdefault(payment.loan_id, []).append(payment)
+            for loan_id in {payment.loan_id for payment in posted}:
+                self.loans[loan_id]['outstanding_balance'] = loans[loan_id]['outstanding_balance']
+                self.loans[loan_id]['remaining_emis'] = loans[loan_id]['remaining_emis']
+        return posted, rejected, len(batch) - len(fresh)
+
+    def get_payments(self, loan_id: int) -> List[Payment]:
+        with self._lock:
+            return list(self._payments_by_loan.get(loan_id, []))
+
+    def get_all_loans(self) -> List[Loan]:
+        customers = {}
+        with self._lock:
+            return [build_loan(self._joined(loan_id), customers)
+                    for loan_id in self._loan_ids]
+
+    def iter_loans(self, batch_size: int = 1000,
+                   after_loan_id: int = 0) -> Iterator[Loan]:
+        while True:
+            with self._lock:
+                start = bisect.bisect_right(self._loan_ids, after_loan_id)
+                rows = [self._joined(loan_id)
+                        for loan_id in self._loan_ids[start:start + batch_size]]
+
+            customers = {}
+            for row in rows:
+                yield build_loan(row, customers)
+
+            if len(rows) < batch_size:
+                return
+            after_loan_id = rows[-1]['loan_id']
+
+    def iter_loan_rows(self, fetch_size: int = 10000) -> Iterator[List[tuple]]:
+        after_loan_id = 0
+        while True:
+            with self._lock:
+                start = bisect.bisect_right(self._loan_ids, after_loan_id)
+                loan_ids = self._loan_ids[start:start + fetch_size]
+                rows = [tuple(self._joined(loan_id)[column] for column in LOAN_SELECT_COLUMNS)
+                        for loan_id in loan_ids]
+            if not rows:
+                return
+            yield rows
+            after_loan_id = loan_ids[-1]
+
+    def get_loan_columns(self, loan_status: str = None,
+                         fetch_size: int = 10000) -> dict:
+        columns = {
+            'loan_id': [],
+            'principal_amount': [],
+            'interest_rate': [],
+            'loan_term': []
+        }
+        with self._lock:
+            for loan_id in self._loan_ids:
+                row = self.loans[loan_id]
+                if loan_status is not None and row['loan_status'] != loan_status:
+                    continue
+                columns['loan_id'].append(loan_id)
+                columns['principal_amount'].append(float(row['principal_amount']))
+                columns['interest_rate'].append(float(row['interest_rate']))
+                columns['loan_term'].append(row['loan_term'])
+        return columns
+
+    def get_loan_frame(self, loan_status: str = None,
+                       fetch_size: int = 10000) -> LoanFrame:
+        frame = LoanFrame()
+        with self._lock:
+            for loan_id in self._loan_ids:
+                row = self.loans[loan_id]
+                if loan_status is not None and row['loan_status'] != loan_status:
+                    continue
+                frame.append(self._joined(loan_id))
+        return frame
+
+    def get_loan_by_id(self, loan_id: int) -> Loan:
+        with self._lock:
+            if loan_id not in self.loans:
+                return None
+            return build_loan(self._joined(loan_id))
+
+    def get_portfolio_summary(self) -> dict:
+        groups = {}
+        with self._lock:
+            for row in self.loans.values():
+                principal = float(row['principal_amount'])
+                rate = float(row['interest_rate'])
+                totals = groups.setdefault((row['loan_type'], row['loan_status']),
+                                           [0, 0.0, 0.0, 0.0, 0.0])
+                totals[0] += 1
+                totals[1] += principal
+                totals[2] += rate
+                totals[3] += principal * rate * row['loan_term'] / 1200
+                totals[4] += float(row['outstanding_balance'])
+        return PortfolioSummary.summarize([key + tuple(totals) for key, totals in groups.items()])
+
+    def find_loans(self, filters: dict = None, order_by: str = "loan_id",
+                   limit: int = None) -> List[Loan]:
+        filters = {name: value for name, value in (filters or {}).items() if value is not None}
+        unknown = set(filters) - set(FIND_FILTERS)
+        if unknown:
+            raise ValueError(f"Unknown loan filter: {', '.join(sorted(unknown))}")
+        column, descending = find_order(order_by)
+
+        with self._lock:
+            # The per-customer index stands in for idx_loan_customer; every
+            # other filter is a scan.
+            if 'customer_id' in filters:
+                candidates = self._loans_by_customer.get(filters['customer_id'], [])
+            else:
+                candidates = self._loan_ids
+            rows = [self.loans[loan_id] for loan_id in candidates
+                    if self._matches(self.loans[loan_id], filters)]
+            rows.sort(key=lambda row: (row[column], row['loan_id']), reverse=descending)
+            if limit is not None:
+                rows = rows[:limit]
+            customers = {}
+            return [build_loan(self._joined(row['loan_id']), customers) for row in rows]
+
+    @staticmethod
+    def _matches(row, filters) -> bool:
+        for name, value in filters.items():
+            if name == 'min_principal':
+                if row['principal_amount'] < value:
+                    return False
+            elif name == 'max_principal':
+                if row['principal_amount'] > value:
+                    return False
+            elif row[name] != value:
+                return False
+        return True
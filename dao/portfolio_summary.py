@@ -0,0 +1,106 @@
+import threading
+from typing import Iterable
+from entities.loan import Loan
+
+# Portfolio totals kept as one running row per (loan_type, loan_status),
+# the same shape PORTFOLIO_GROUPS returns. A repository loads it with one
+# GROUP BY and then adjusts it as it writes, so a dashboard reads a handful
+# of numbers instead of the whole book. Only writes made through this
+# process are tracked; load() again to pick up anyone else's.
+class PortfolioSummary:
+    def __init__(self):
+        self._groups = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._groups is not None
+
+    def load(self, rows) -> None:
+        groups = {}
+        for loan_type, loan_status, loans, principal, rate_sum, interest, balance in rows:
+            groups[(loan_type, loan_status)] = [int(loans), float(principal or 0),
+                                                float(rate_sum or 0), float(interest or 0),
+                                                float(balance or 0)]
+        with self._lock:
+            self._groups = groups
+
+    def add_loans(self, loans: Iterable[Loan]) -> None:
+        with self._lock:
+            if self._groups is None:
+                return
+            for loan in loans:
+                self._add(loan, loan.loan_status, 1)
+
+    def move(self, loan: Loan, old_status: str, new_status: str) -> None:
+        if old_status == new_status:
+            return
+        with self._lock:
+            if self._groups is None:
+                return
+            self._add(loan, old_status, -1)
+            self._add(loan, new_status, 1)
+
+    def repay(self, loan_type: str, loan_status: str, principal_paid: float) -> None:
+        with self._lock:
+            totals = self._groups.get((loan_type, loan_status)) if self._groups else None
+            if totals is not None:
+                totals[4] -= principal_paid
+
+    def summary(self) -> dict:
+        with self._lock:
+            rows = [key + tuple(totals) for key, totals in self._groups.items()]
+        return PortfolioSummary.summarize(rows)
+
+    def _add(self, loan, loan_status, sign) -> None:
+        # A loan that moves between statuses takes its full principal along,
+        # since the Loan entity does not carry the outstanding balance; the
+        # next load() corrects that for loans with payments posted.
+        principal = float(loan.principal_amount)
+        rate = float(loan.interest_rate)
+        totals = self._groups.setdefault((loan.loan_type, loan_status), [0, 0.0, 0.0, 0.0, 0.0])
+        totals[0] += sign
+        totals[1] += sign * principal
+        totals[2] += sign * rate
+        totals[3] += sign * principal * rate * loan.loan_term / 1200
+        totals[4] += sign * principal
+        if totals[0] == 0:
+            del self._groups[(loan.loan_type, loan_status)]
+
+    @staticmethod
+    def summarize(rows) -> dict:
+        # Outstanding principal is the balance still owed on approved loans,
+        # the part of the book that has been lent out.
+        by_type = {}
+        total = PortfolioSummary._empty()
+        for loan_type, loan_status, loans, principal, rate_sum, interest, balance in rows:
+            entry = by_type.setdefault(loan_type, PortfolioSummary._empty())
+            for target in (entry, total):
+                target['loans'] += int(loans)
+                target['principal_amount'] += float(principal or 0)
+                target['projected_interest'] += float(interest or 0)
+                target['average_interest_rate'] += float(rate_sum or 0)
+                if loan_status == "Approved":
+                    target['outstanding_principal'] += float(balance or 0)
+                if loan_status in target['by_status']:
+                    target['by_status'][loan_status] += int(loans)
+
+        for entry in list(by_type.values()) + [total]:
+            entry['average_interest_rate'] = (entry['average_interest_rate'] / entry['loans']
+                                              if entry['loans'] else None)
+            decided = entry['by_status']['Approved'] + entry['by_status']['Rejected']
+            entry['approval_rate'] = (entry['by_status']['Approved'] / decided
+                                      if decided else None)
+        return {'by_type': by_type, 'total': total}
+
+    @staticmethod
+    def _empty() -> dict:
+        return {
+            'loans': 0,
+            'principal_amount': 0.0,
+            'outstanding_principal': 0.0,
+            'average_interest_rate': 0.0,
+            'projected_interest': 0.0,
+            'by_status': {'Pending': 0, 'Approved': 0, 'Rejected': 0},
+            'approval_rate': None
+        }
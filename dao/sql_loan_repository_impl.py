@@ -0,0 +1,398 @@
+from typing import Iterable, Iterator, List, Tuple
+from dao.loan_repository import ILoanRepository
+from dao.loan_sql import (CUSTOMER_UPSERT, LOAN_INSERT, HOME_LOAN_INSERT, CAR_LOAN_INSERT,
+                          LOAN_PAGE_SELECT, LOAN_BY_ID_SELECT, LOAN_SELECT, LOAN_STATUS_UPDATE,
+                          PORTFOLIO_GROUPS, PAYMENT_INSERT, PAYMENTS_BY_LOAN_SELECT,
+                          LOAN_BALANCE_UPDATE, LOAN_TERMS_SELECT, LOAN_TERMS_MISSING,
+                          LOAN_TERMS_FILL, LOAN_TERMS_UPDATE, balance_params, build_loan,
+                          build_payment, decide_loans_sql, extend_loan_columns, fill_params,
+                          find_loans_sql, insert_params, loan_columns_sql, loan_frame_sql,
+                          new_loan_columns, payment_params, posted_references_sql,
+                          posting_state, posting_state_sql, stored_terms, terms_update_params)
+from dao.portfolio_summary import PortfolioSummary
+from entities.loan import Loan
+from entities.loan_frame import LoanFrame
+from entities.payment import Payment
+from exceptions.invalid_loan_exception import InvalidLoanException
+from util.loan_calculator import LoanCalculator
+from util.payment_posting import PaymentPosting
+
+
+# ILoanRepository over a DB-API driver, shared by the MySQL and SQLite
+# backends so a fix to one applies to both. Subclasses supply _cursor(),
+# which yields (connection, cursor) for one transaction and accepts the
+# mysql-connector cursor options (dictionary=True for rows read by column
+# name); _db_error, the driver's base exception; and, where the dialect
+# differs, _sql() to rewrite the shared %s statements, CUSTOMER_UPSERT,
+# LOCK_ROWS, _decide_loans_sql() and iter_loan_rows(). The loan cache,
+# incremental portfolio summary and write-behind queue are off unless a
+# subclass sets them up.
+class SQLLoanRepositoryImpl(ILoanRepository):
+    CUSTOMER_UPSERT = CUSTOMER_UPSERT
+    # Appended to the reads that rows are updated from within a transaction.
+    LOCK_ROWS = " FOR UPDATE"
+
+    cache = None
+    summary = None
+    write_queue = None
+
+    @property
+    def _db_error(self):
+        raise NotImplementedError
+
+    def _sql(self, query: str) -> str:
+        return query
+
+    def apply_loan(self, loan: Loan) -> None:
+        confirmation = input("Confirm loan application (yes/no): ").lower()
+        if confirmation != 'yes':
+            print("Loan application cancelled.")
+            return
+
+        if self.write_queue:
+            if self.write_queue.apply(loan):
+                print("Loan application submitted successfully. Status: Pending")
+            else:
+                print("Loan application queued. Status: Pending")
+            return
+
+        try:
+            with self._cursor() as (connection, cursor):
+                self._insert_loans(cursor, [loan])
+                connection.commit()
+            self._loans_written([loan])
+            print("Loan application submitted successfully. Status: Pending")
+
+        except self._db_error as e:
+            raise InvalidLoanException(f"Error applying for loan: {e}")
+
+    def apply_loans(self, loans: Iterable[Loan],
+                    batch_size: int = 500) -> List[Tuple[Loan, str]]:
+        failures = []
+        batch = []
+        for loan in loans:
+            batch.append(loan)
+            if len(batch) == batch_size:
+                failures.extend(self._apply_batch(batch))
+                batch = []
+        if batch:
+            failures.extend(self._apply_batch(batch))
+        return failures
+
+    def _apply_batch(self, batch: List[Loan]) -> List[Tuple[Loan, str]]:
+        try:
+            with self._cursor() as (connection, cursor):
+                self._insert_loans(cursor, batch)
+                connection.commit()
+            self._loans_written(batch)
+            return []
+        except (self._db_error, InvalidLoanException) as e:
+            if len(batch) == 1:
+                return [(batch[0], str(e))]
+
+        # The batch was rolled back; replay it row by row so only the
+        # offending loans are reported and the rest still go in.
+        failures = []
+        for loan in batch:
+            failures.extend(self._apply_batch([loan]))
+        return failures
+
+    def _insert_loans(self, cursor, loans: List[Loan]) -> None:
+        customers, base_loans, home_loans, car_loans = insert_params(loans)
+        cursor.executemany(self._sql(self.CUSTOMER_UPSERT), customers)
+        cursor.executemany(self._sql(LOAN_INSERT), base_loans)
+        if home_loans:
+            cursor.executemany(self._sql(HOME_LOAN_INSERT), home_loans)
+        if car_loans:
+            cursor.executemany(self._sql(CAR_LOAN_INSERT), car_loans)
+
+    def _loans_written(self, loans: List[Loan]) -> None:
+        if self.cache:
+            for loan in loans:
+                self.cache.invalidate(loan.loan_id)
+                # The batch upserted this customer, so the copies of it held
+                # by their other cached loans may be stale too.
+                self.cache.invalidate_customer(loan.customer.customer_id)
+        if self.summary:
+            self.summary.add_loans(loans)
+
+    def calculate_interest(self, loan_id: int) -> float:
+        return self._stored_terms(loan_id)[1]
+
+    def _stored_terms(self, loan_id: int) -> Tuple[float, float]:
+        try:
+            with self._cursor() as (connection, cursor):
+                cursor.execute(self._sql(LOAN_TERMS_SELECT), (loan_id,))
+                row = cursor.fetchone()
+        except self._db_error as e:
+            raise InvalidLoanException(f"Error retrieving loan: {e}")
+        if not row:
+            raise InvalidLoanException(f"Loan not found with ID: {loan_id}")
+        return stored_terms(loan_id, tuple(row))
+
+    def calculate_interest_amount(self, principal_amount: float,
+                                  interest_rate: float,
+                                  loan_term: int) -> float:
+        return LoanCalculator.interest_amount(principal_amount, interest_rate, loan_term)
+
+    def loan_status(self, loan_id: int) -> str:
+        loan = self.get_loan_by_id(loan_id)
+        if not loan:
+            raise InvalidLoanException(f"Loan not found with ID: {loan_id}")
+
+        min_score = self.credit_rules.get(loan.loan_type, self.credit_rules['default'])
+        status = "Approved" if loan.customer.credit_score > min_score else "Rejected"
+
+        try:
+            with self._cursor() as (connection, cursor):
+                cursor.execute(self._sql(LOAN_STATUS_UPDATE), (status, loan_id))
+                connection.commit()
+            if self.cache:
+                self.cache.invalidate(loan_id)
+            if self.summary:
+                self.summary.move(loan, loan.loan_status, status)
+
+            loan.loan_status = status
+            return status
+
+        except self._db_error as e:
+            raise InvalidLoanException(f"Error updating loan status: {e}")
+
+    def decide_loans(self, loan_status: str = "Pending", loan_type: str = None,
+                     loan_ids: List[int] = None,
+                     loan_id_range: Tuple[int, int] = None) -> dict:
+        if loan_ids is not None and not loan_ids:
+            return {'Approved': 0, 'Rejected': 0}
+        count_sql, update_sql, params = self._decide_loans_sql(
+            loan_status, loan_type, loan_ids, loan_id_range)
+
+        try:
+            with self._cursor() as (connection, cursor):
+                cursor.execute(self._sql(count_sql), params)
+                approved, total = cursor.fetchone()
+                cursor.execute(self._sql(update_sql), params)
+                connection.commit()
+            if self.cache:
+                self.cache.clear()
+            if self.summary and self.summary.loaded:
+                self.summary.load(self._portfolio_groups())
+
+            approved = int(approved)
+            return {'Approved': approved, 'Rejected': total - approved}
+
+        except self._db_error as e:
+            raise InvalidLoanException(f"Error updating loan status: {e}")
+
+    def _decide_loans_sql(self, loan_status, loan_type, loan_ids, loan_id_range):
+        return decide_loans_sql(self.credit_rules, loan_status, loan_type, loan_ids,
+                                loan_id_range)
+
+    def calculate_emi(self, loan_id: int) -> float:
+        return self._stored_terms(loan_id)[0]
+
+    def calculate_emi_amount(self, principal_amount: float,
+                             interest_rate: float,
+                             loan_term: int) -> float:
+        return LoanCalculator.emi_amount(principal_amount, interest_rate, loan_term)
+
+    def change_loan_terms(self, loan_id: int, interest_rate: float = None,
+                          loan_term: int = None) -> None:
+        try:
+            with self._cursor() as (connection, cursor):
+                cursor.execute(self._sql(LOAN_TERMS_SELECT + self.LOCK_ROWS), (loan_id,))
+                row = cursor.fetchone()
+                if not row:
+                    raise InvalidLoanException(f"Loan not found with ID: {loan_id}")
+                cursor.execute(self._sql(LOAN_TERMS_UPDATE),
+                               terms_update_params(loan_id, tuple(row), interest_rate, loan_term))
+                connection.commit()
+            if self.cache:
+                self.cache.invalidate(loan_id)
+            if self.summary and self.summary.loaded:
+                self.summary.load(self._portfolio_groups())
+
+        except self._db_error as e:
+            raise InvalidLoanException(f"Error changing loan terms: {e}")
+
+    def backfill_loan_terms(self, batch_size: int = 10000) -> int:
+        # One transaction per batch of rows still missing their terms, in
+        # loan_id order, so an interrupted backfill simply continues.
+        filled = 0
+        last_loan_id = 0
+        try:
+            while True:
+                with self._cursor() as (connection, cursor):
+                    cursor.execute(self._sql(LOAN_TERMS_MISSING), (last_loan_id, batch_size))
+                    rows = [tuple(row) for row in cursor.fetchall()]
+                    if not rows:
+                        return filled
+                    params = fill_params(rows)
+                    if params:
+                        cursor.executemany(self._sql(LOAN_TERMS_FILL), params)
+                    connection.commit()
+                filled += len(params)
+                last_loan_id = rows[-1][0]
+        except self._db_error as e:
+            raise InvalidLoanException(f"Error backfilling loan terms: {e}")
+
+    def loan_repayment(self, loan_id: int, amount: float) -> None:
+        payment = PaymentPosting.repayment(loan_id, amount)
+        PaymentPosting.report_repayment(payment, self.post_payments([payment]))
+
+    def post_payments(self, payments: Iterable[Payment],
+                      batch_size: int = 1000) -> dict:
+        # Each batch is one transaction: references already in the ledger
+        # are skipped, the touched loans are locked in id order, and the
+        # ledger rows and new balances go in with two executemany calls.
+        # A reference seen twice, in this run or an earlier one, is counted
+        # as a duplicate and never posted again.
+        return PaymentPosting.post(payments, batch_size, self._write_payments, self._db_error)
+
+    def _write_payments(self, batch: List[Payment]) -> Tuple[list, list, int]:
+        with self._cursor() as (connection, cursor):
+            references = [payment.payment_reference for payment in batch]
+            cursor.execute(self._sql(posted_references_sql(len(references))), references)
+            posted_before = {row[0] for row in cursor.fetchall()}
+            fresh = [payment for payment in batch
+                     if payment.payment_reference not in posted_before]
+
+            loans = {}
+            if fresh:
+                loan_ids = sorted({payment.loan_id for payment in fresh})
+                cursor.execute(self._sql(posting_state_sql(len(loan_ids)) + self.LOCK_ROWS),
+                               loan_ids)
+                loans = posting_state(cursor.fetchall())
+            posted, rejected = PaymentPosting.allocate(fresh, loans)
+
+            if posted:
+                cursor.executemany(self._sql(PAYMENT_INSERT), payment_params(posted))
+                touched = sorted({payment.loan_id for payment in posted})
+                cursor.executemany(self._sql(LOAN_BALANCE_UPDATE),
+                                   balance_params(loans, touched))
+            connection.commit()
+
+        if self.summary:
+            for payment in posted:
+                loan = loans[payment.loan_id]
+                self.summary.repay(loan['loan_type'], loan['loan_status'], payment.principal_paid)
+        return posted, rejected, len(batch) - len(fresh)
+
+    def get_payments(self, loan_id: int) -> List[Payment]:
+        try:
+            with self._cursor() as (connection, cursor):
+                cursor.execute(self._sql(PAYMENTS_BY_LOAN_SELECT), (loan_id,))
+                return [build_payment(row) for row in cursor.fetchall()]
+        except self._db_error as e:
+            raise InvalidLoanException(f"Error retrieving payments: {e}")
+
+    def get_all_loans(self) -> List[Loan]:
+        customers = {}
+        try:
+            with self._cursor(dictionary=True) as (connection, cursor):
+                cursor.execute(LOAN_SELECT)
+                return [build_loan(row, customers) for row in cursor.fetchall()]
+        except self._db_error as e:
+            raise InvalidLoanException(f"Error retrieving loans: {e}")
+
+    def iter_loans(self, batch_size: int = 1000,
+                   after_loan_id: int = 0) -> Iterator[Loan]:
+        # Keyset pagination on loan_id: each page starts after the last id
+        # seen, so memory is bounded by one page and no OFFSET scan is needed.
+        while True:
+            try:
+                with self._cursor(dictionary=True) as (connection, cursor):
+                    cursor.execute(self._sql(LOAN_PAGE_SELECT), (after_loan_id, batch_size))
+                    rows = cursor.fetchall()
+            except self._db_error as e:
+                raise InvalidLoanException(f"Error retrieving loans: {e}")
+
+            customers = {}
+            for row in rows:
+                yield build_loan(row, customers)
+
+            if len(rows) < batch_size:
+                return
+            after_loan_id = rows[-1]['loan_id']
+
+    def get_loan_columns(self, loan_status: str = None,
+                         fetch_size: int = 10000) -> dict:
+        columns = new_loan_columns()
+        query, params = loan_columns_sql(loan_status)
+        try:
+            with self._cursor() as (connection, cursor):
+                cursor.execute(self._sql(query), params)
+                while True:
+                    rows = cursor.fetchmany(fetch_size)
+                    if not rows:
+                        break
+                    extend_loan_columns(columns, rows)
+        except self._db_error as e:
+            raise InvalidLoanException(f"Error retrieving loans: {e}")
+
+        return columns
+
+    def get_loan_frame(self, loan_status: str = None,
+                       fetch_size: int = 10000) -> LoanFrame:
+        frame = LoanFrame()
+        query, params = loan_frame_sql(loan_status)
+        try:
+            with self._cursor(dictionary=True) as (connection, cursor):
+                cursor.execute(self._sql(query), params)
+                while True:
+                    rows = cursor.fetchmany(fetch_size)
+                    if not rows:
+                        break
+                    frame.extend(rows)
+        except self._db_error as e:
+            raise InvalidLoanException(f"Error retrieving loans: {e}")
+
+        return frame
+
+    def get_loan_by_id(self, loan_id: int) -> Loan:
+        # The cache holds rows, not Loans: every caller gets its own Loan to
+        # read or change, as it would from the database.
+        if self.cache:
+            row = self.cache.get(loan_id)
+            if row is not None:
+                return build_loan(row)
+
+        try:
+            with self._cursor(dictionary=True) as (connection, cursor):
+                cursor.execute(self._sql(LOAN_BY_ID_SELECT), (loan_id,))
+                row = cursor.fetchone()
+        except self._db_error as e:
+            raise InvalidLoanException(f"Error retrieving loan: {e}")
+
+        if not row:
+            return None
+        if self.cache:
+            self.cache.put(loan_id, dict(row), row['customer_id'])
+        return build_loan(row)
+
+    def get_portfolio_summary(self) -> dict:
+        if self.summary is None:
+            return PortfolioSummary.summarize(self._portfolio_groups())
+        if not self.summary.loaded:
+            self.summary.load(self._portfolio_groups())
+        return self.summary.summary()
+
+    def _portfolio_groups(self):
+        try:
+            with self._cursor() as (connection, cursor):
+                cursor.execute(PORTFOLIO_GROUPS)
+                return cursor.fetchall()
+        except self._db_error as e:
+            raise InvalidLoanException(f"Error summarizing loans: {e}")
+
+    def find_loans(self, filters: dict = None, order_by: str = "loan_id",
+                   limit: int = None) -> List[Loan]:
+        # filters: customer_id, loan_status, loan_type, min_principal and
+        # max_principal, all pushed down into the WHERE clause.
+        query, params = find_loans_sql(filters, order_by, limit)
+        customers = {}
+        try:
+            with self._cursor(dictionary=True) as (connection, cursor):
+                cursor.execute(self._sql(query), params)
+                return [build_loan(row, customers) for row in cursor.fetchall()]
+        except self._db_error as e:
+            raise InvalidLoanException(f"Error retrieving loans: {e}")
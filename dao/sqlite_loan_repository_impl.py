@@ -0,0 +1,112 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List
+from dao.loan_sql import LOAN_PAGE_SELECT, APPROVE_CONDITION, credit_rules_params, decide_filters
+from dao.sql_loan_repository_impl import SQLLoanRepositoryImpl
+from exceptions.invalid_loan_exception import InvalidLoanException
+from util.db_migration_util import DBMigrationUtil
+from util.db_property_util import DBPropertyUtil
+
+SCHEMA_FILE = os.path.join(os.path.dirname(__file__), "..", "db", "schema.sql")
+
+CUSTOMER_UPSERT = """
+    INSERT INTO Customer (customer_id, name, email_address, phone_number, address, credit_score)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT (customer_id) DO UPDATE SET
+    name = excluded.name,
+    email_address = excluded.email_address,
+    phone_number = excluded.phone_number,
+    address = excluded.address,
+    credit_score = excluded.credit_score
+"""
+
+
+# Embedded ILoanRepository backed by SQLite, either a file or ":memory:".
+# It needs no server, so tests and benchmarks can run anywhere. One
+# connection is shared and every operation holds a lock for its duration,
+# which keeps ":memory:" databases (private to their connection) usable
+# from several threads.
+class SQLiteLoanRepositoryImpl(SQLLoanRepositoryImpl):
+    CUSTOMER_UPSERT = CUSTOMER_UPSERT
+    # SQLite locks the whole database for a write transaction instead.
+    LOCK_ROWS = ""
+
+    def __init__(self, database=":memory:", property_file="config.ini"):
+        self.database = database
+        self.credit_rules = DBPropertyUtil.get_credit_rules(property_file)
+        self.connection = sqlite3.connect(database, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self._lock = threading.RLock()
+        with open(SCHEMA_FILE) as f:
+            self.connection.executescript(f.read())
+        DBMigrationUtil.apply_migrations(self.connection, "?")
+
+    def __del__(self):
+        if hasattr(self, 'connection'):
+            self.connection.close()
+
+    @contextmanager
+    def _cursor(self, **kwargs):
+        # sqlite3.Row reads by position and by name alike, so the
+        # mysql-connector cursor options need no counterpart here.
+        with self._lock:
+            cursor = self.connection.cursor()
+            try:
+                yield self.connection, cursor
+            except BaseException:
+                self.connection.rollback()
+                raise
+            finally:
+                cursor.close()
+
+    @property
+    def _db_error(self):
+        return sqlite3.Error
+
+    def _sql(self, query: str) -> str:
+        # The shared statements are written for MySQL's %s paramstyle.
+        return query.replace("%s", "?")
+
+    def _decide_loans_sql(self, loan_status, loan_type, loan_ids, loan_id_range):
+        # SQLite has no UPDATE ... JOIN; the customer comes in through
+        # UPDATE ... FROM, joined in the WHERE clause.
+        where, filter_params = decide_filters(loan_status, loan_type, loan_ids, loan_id_range)
+        params = credit_rules_params(self.credit_rules) + filter_params
+        join = "c.customer_id = l.customer_id"
+        update_where = f"{where} AND {join}" if where else f"WHERE {join}"
+
+        count_sql = f"""
+            SELECT COALESCE(SUM({APPROVE_CONDITION}), 0), COUNT(*)
+            FROM Loan l JOIN Customer c ON l.customer_id = c.customer_id
+            {where}
+        """
+        update_sql = f"""
+            UPDATE Loan AS l
+            SET loan_status = CASE WHEN {APPROVE_CONDITION} THEN 'Approved' ELSE 'Rejected' END
+            FROM Customer AS c
+            {update_where}
+        """
+        return count_sql, update_sql, params
+
+    def iter_loan_rows(self, fetch_size: int = 10000) -> Iterator[List[tuple]]:
+        # One keyset page per chunk, each read under the lock, so nothing is
+        # held between chunks: the shared connection serves other callers
+        # meanwhile, and a consumer that stops early, on any thread, leaves
+        # no open cursor or lock behind.
+        after_loan_id = 0
+        while True:
+            try:
+                with self._cursor() as (connection, cursor):
+                    cursor.row_factory = None
+                    cursor.execute(self._sql(LOAN_PAGE_SELECT), (after_loan_id, fetch_size))
+                    rows = cursor.fetchall()
+            except sqlite3.Error as e:
+                raise InvalidLoanException(f"Error retrieving loans: {e}")
+
+            if rows:
+                yield rows
+            if len(rows) < fetch_size:
+                return
+            after_loan_id = rows[-1][0]
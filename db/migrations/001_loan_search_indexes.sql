@@ -0,0 +1,5 @@
+-- Secondary indexes for find_loans: a customer's loans, a status/type
+-- work queue with an optional principal range, and principal ranges alone.
+CREATE INDEX idx_loan_customer ON Loan (customer_id);
+CREATE INDEX idx_loan_status_type ON Loan (loan_status, loan_type, principal_amount);
+CREATE INDEX idx_loan_principal ON Loan (principal_amount);
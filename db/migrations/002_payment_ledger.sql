@@ -0,0 +1,23 @@
+-- Outstanding balance and EMIs left on every loan, and the ledger of
+-- posted payments. payment_reference is the bank's id for a payment and
+-- makes posting idempotent. Each ledger row also keeps the balance and
+-- EMIs left after it, which orders a loan's payments.
+ALTER TABLE Loan ADD COLUMN outstanding_balance DECIMAL(15, 2);
+ALTER TABLE Loan ADD COLUMN remaining_emis INT;
+UPDATE Loan SET outstanding_balance = principal_amount, remaining_emis = loan_term
+WHERE outstanding_balance IS NULL;
+
+CREATE TABLE IF NOT EXISTS Payment (
+    payment_reference VARCHAR(64) PRIMARY KEY,
+    loan_id INT NOT NULL,
+    amount DECIMAL(15, 2),
+    payment_date DATE,
+    emis_paid INT,
+    principal_paid DECIMAL(15, 2),
+    interest_paid DECIMAL(15, 2),
+    outstanding_balance DECIMAL(15, 2),
+    remaining_emis INT,
+    posted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (loan_id) REFERENCES Loan(loan_id)
+);
+CREATE INDEX idx_payment_loan ON Payment (loan_id);
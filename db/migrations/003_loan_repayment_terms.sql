@@ -0,0 +1,7 @@
+-- EMI, total interest and total payable, computed from principal, rate
+-- and term when a loan is written, so reads no longer recompute them.
+-- Existing rows are left NULL here and filled in bulk by
+-- python main.py backfill-terms. Until then reads compute them as before.
+ALTER TABLE Loan ADD COLUMN emi_amount DECIMAL(15, 2);
+ALTER TABLE Loan ADD COLUMN total_interest DECIMAL(15, 2);
+ALTER TABLE Loan ADD COLUMN total_payable DECIMAL(15, 2);
@@ -0,0 +1,5 @@
+-- Total payable was stored as principal plus simple interest, which is not
+-- what the stored EMI collects over the term. Recompute it as EMI times term
+-- for the rows 003 or backfill-terms already filled.
+UPDATE Loan SET total_payable = ROUND(emi_amount * loan_term, 2)
+WHERE emi_amount IS NOT NULL;
@@ -0,0 +1,33 @@
+CREATE TABLE IF NOT EXISTS Customer (
+    customer_id INT PRIMARY KEY,
+    name VARCHAR(100),
+    email_address VARCHAR(100),
+    phone_number VARCHAR(20),
+    address VARCHAR(255),
+    credit_score INT
+);
+
+CREATE TABLE IF NOT EXISTS Loan (
+    loan_id INT PRIMARY KEY,
+    customer_id INT,
+    principal_amount DECIMAL(15, 2),
+    interest_rate DECIMAL(5, 2),
+    loan_term INT,
+    loan_type VARCHAR(20),
+    loan_status VARCHAR(20) DEFAULT 'Pending',
+    FOREIGN KEY (customer_id) REFERENCES Customer(customer_id)
+);
+
+CREATE TABLE IF NOT EXISTS HomeLoan (
+    loan_id INT PRIMARY KEY,
+    property_address VARCHAR(255),
+    property_value INT,
+    FOREIGN KEY (loan_id) REFERENCES Loan(loan_id)
+);
+
+CREATE TABLE IF NOT EXISTS CarLoan (
+    loan_id INT PRIMARY KEY,
+    car_model VARCHAR(100),
+    car_value INT,
+    FOREIGN KEY (loan_id) REFERENCES Loan(loan_id)
+);
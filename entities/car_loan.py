@@ -1,6 +1,8 @@
 from entities.loan import Loan
 
 class CarLoan(Loan):
+    __slots__ = ('car_model', 'car_value')
+
     def __init__(self, loan_id=None, customer=None, principal_amount=None, 
                  interest_rate=None, loan_term=None, loan_status="Pending", 
                  car_model=None, car_value=None):
@@ -1,4 +1,7 @@
 class Customer:
+    __slots__ = ('customer_id', 'name', 'email_address', 'phone_number',
+                 'address', 'credit_score')
+
     def __init__(self, customer_id=None, name=None, email_address=None, 
                  phone_number=None, address=None, credit_score=None):
         self.customer_id = customer_id
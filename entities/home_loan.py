@@ -1,6 +1,8 @@
 from entities.loan import Loan
 
 class HomeLoan(Loan):
+    __slots__ = ('property_address', 'property_value')
+
     def __init__(self, loan_id=None, customer=None, principal_amount=None, 
                  interest_rate=None, loan_term=None, loan_status="Pending", 
                  property_address=None, property_value=None):
@@ -1,6 +1,9 @@
 from entities.customer import Customer
 
 class Loan:
+    __slots__ = ('loan_id', 'customer', 'principal_amount', 'interest_rate',
+                 'loan_term', 'loan_type', 'loan_status')
+
     def __init__(self, loan_id=None, customer=None, principal_amount=None, 
                  interest_rate=None, loan_term=None, loan_type=None, 
                  loan_status="Pending"):
@@ -0,0 +1,107 @@
+import math
+from array import array
+from entities.customer import Customer
+from entities.loan import Loan
+from entities.home_loan import HomeLoan
+from entities.car_loan import CarLoan
+
+# Columnar alternative to a list of Loan objects for large result sets.
+# Numeric columns live in typed arrays, loan type and status are stored as
+# one-byte codes, and each customer is kept once no matter how many loans it
+# holds. Loan entities are only built when a row is asked for.
+class LoanFrame:
+    def __init__(self):
+        self.loan_id = array('q')
+        self.customer_id = array('q')
+        self.principal_amount = array('d')
+        self.interest_rate = array('d')
+        self.loan_term = array('q')
+        self.loan_type = array('B')
+        self.loan_status = array('B')
+        # property_address/property_value for home loans, car_model/car_value
+        # for car loans, '' and NaN for anything else.
+        self.asset_label = []
+        self.asset_value = array('d')
+        self.customers = {}
+        self._codes = {'loan_type': {}, 'loan_status': {}}
+        self._values = {'loan_type': [], 'loan_status': []}
+        self._labels = {}
+
+    def __len__(self):
+        return len(self.loan_id)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.loan(index)
+
+    def append(self, row) -> None:
+        customer_id = row['customer_id']
+        if customer_id not in self.customers:
+            self.customers[customer_id] = Customer(
+                customer_id=customer_id,
+                name=row['name'],
+                email_address=row['email_address'],
+                phone_number=row['phone_number'],
+                address=row['address'],
+                credit_score=row['credit_score']
+            )
+
+        self.loan_id.append(row['loan_id'])
+        self.customer_id.append(customer_id)
+        self.principal_amount.append(float(row['principal_amount']))
+        self.interest_rate.append(float(row['interest_rate']))
+        self.loan_term.append(row['loan_term'])
+        self.loan_type.append(self._encode('loan_type', row['loan_type']))
+        self.loan_status.append(self._encode('loan_status', row['loan_status']))
+
+        if row['loan_type'] == "HomeLoan":
+            label, value = row['property_address'], row['property_value']
+        elif row['loan_type'] == "CarLoan":
+            label, value = row['car_model'], row['car_value']
+        else:
+            label, value = '', None
+        label = label or ''
+        self.asset_label.append(self._labels.setdefault(label, label))
+        self.asset_value.append(math.nan if value is None else float(value))
+
+    def extend(self, rows) -> None:
+        for row in rows:
+            self.append(row)
+
+    def loan(self, index) -> Loan:
+        loan_type = self._values['loan_type'][self.loan_type[index]]
+        loan_status = self._values['loan_status'][self.loan_status[index]]
+        customer = self.customers[self.customer_id[index]]
+        value = self.asset_value[index]
+        value = None if math.isnan(value) else value
+
+        if loan_type == "HomeLoan":
+            return HomeLoan(self.loan_id[index], customer, self.principal_amount[index],
+                            self.interest_rate[index], self.loan_term[index], loan_status,
+                            self.asset_label[index], value)
+        elif loan_type == "CarLoan":
+            return CarLoan(self.loan_id[index], customer, self.principal_amount[index],
+                           self.interest_rate[index], self.loan_term[index], loan_status,
+                           self.asset_label[index], value)
+        return Loan(self.loan_id[index], customer, self.principal_amount[index],
+                    self.interest_rate[index], self.loan_term[index], loan_type,
+                    loan_status)
+
+    def columns(self) -> dict:
+        # Same shape as ILoanRepository.get_loan_columns, so a frame can be
+        # handed straight to PortfolioCalculator or AmortizationSchedule.
+        return {
+            'loan_id': self.loan_id,
+            'principal_amount': self.principal_amount,
+            'interest_rate': self.interest_rate,
+            'loan_term': self.loan_term
+        }
+
+    def _encode(self, column, value) -> int:
+        codes = self._codes[column]
+        code = codes.get(value)
+        if code is None:
+            code = len(self._values[column])
+            codes[value] = code
+            self._values[column].append(value)
+        return code
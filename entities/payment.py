@@ -0,0 +1,29 @@
+class Payment:
+    __slots__ = ('payment_reference', 'loan_id', 'amount', 'payment_date',
+                 'emis_paid', 'principal_paid', 'interest_paid',
+                 'outstanding_balance', 'remaining_emis')
+
+    def __init__(self, payment_reference=None, loan_id=None, amount=None,
+                 payment_date=None, emis_paid=0, principal_paid=0.0,
+                 interest_paid=0.0, outstanding_balance=None,
+                 remaining_emis=None):
+        self.payment_reference = payment_reference
+        self.loan_id = loan_id
+        self.amount = amount
+        self.payment_date = payment_date
+        self.emis_paid = emis_paid
+        self.principal_paid = principal_paid
+        self.interest_paid = interest_paid
+        self.outstanding_balance = outstanding_balance
+        self.remaining_emis = remaining_emis
+
+    def print_info(self):
+        print(f"Payment Reference: {self.payment_reference}")
+        print(f"Loan ID: {self.loan_id}")
+        print(f"Amount: {self.amount}")
+        print(f"Payment Date: {self.payment_date}")
+        print(f"EMIs Paid: {self.emis_paid}")
+        print(f"Principal Paid: {self.principal_paid}")
+        print(f"Interest Paid: {self.interest_paid}")
+        print(f"Outstanding Balance: {self.outstanding_balance}")
+        print(f"Remaining EMIs: {self.remaining_emis}")
@@ -1,12 +1,233 @@
-from dao.loan_repository_impl import ILoanRepositoryImpl
+import argparse
+import sys
+import time
+from dao.loan_repository_factory import LoanRepositoryFactory
 from entities.customer import Customer
 from entities.home_loan import HomeLoan
 from entities.car_loan import CarLoan
 from exceptions.invalid_loan_exception import InvalidLoanException
+from util.loan_calculator import LoanCalculator
+from util.loan_exporter import EXPORT_FORMATS, LoanExporter
+from util.loan_file_util import FILE_FORMATS, LoanFileUtil
+from util.shard_runner import JOBS, ShardRunner
 
-def main():
-    loan_repo = ILoanRepositoryImpl()
+def main(argv=None):
+    args = parse_args(argv)
+    if not args.command:
+        menu(LoanRepositoryFactory.create(args.config))
+        return
+    # Commands that do not touch the database never build a repository, so
+    # they load no driver and read no database settings.
+    loan_repo = LoanRepositoryFactory.create(args.config) if args.needs_repository else None
+    sys.exit(args.handler(loan_repo, args))
+
+def parse_args(argv=None):
+    # Without a command the interactive menu runs as before. Commands never
+    # prompt, write results to stdout as they go and report throughput on
+    # stderr, e.g.
+    #   python main.py apply loans.csv
+    #   python main.py list --format jsonl > book.jsonl
+    #   cut -f1 ids.txt | python main.py emi -
+    parser = argparse.ArgumentParser(description="Loan Management System")
+    parser.add_argument("--config", default="config.ini", help="property file")
+    parser.set_defaults(needs_repository=True)
+    commands = parser.add_subparsers(dest="command")
+    
+    apply_parser = commands.add_parser("apply", help="apply for every loan in a CSV/JSONL file")
+    apply_parser.add_argument("file", help="loan file, or - for stdin")
+    apply_parser.add_argument("--format", choices=FILE_FORMATS)
+    apply_parser.add_argument("--batch-size", type=int, default=500)
+    apply_parser.set_defaults(handler=apply_command, file_formats=FILE_FORMATS,
+                              stdio_format="jsonl")
+    
+    list_parser = commands.add_parser("list", help="stream every loan to stdout")
+    list_parser.add_argument("--format", choices=FILE_FORMATS, default="csv")
+    list_parser.add_argument("--chunk-size", type=int, default=10000)
+    list_parser.set_defaults(handler=list_command)
+    
+    emi_parser = commands.add_parser("emi", help="monthly EMI of each loan id")
+    emi_parser.add_argument("loan_ids", nargs="+", help="loan ids, or - to read them from stdin")
+    emi_parser.set_defaults(handler=emi_command)
+    
+    status_parser = commands.add_parser("status", help="decide and print the status of each loan id")
+    status_parser.add_argument("loan_ids", nargs="+", help="loan ids, or - to read them from stdin")
+    status_parser.set_defaults(handler=status_command)
+    
+    export_parser = commands.add_parser("export",
+                                        help="write every loan to a CSV/JSONL/Parquet file")
+    export_parser.add_argument("file", help="output file, or - for stdout")
+    export_parser.add_argument("--format", choices=EXPORT_FORMATS)
+    export_parser.add_argument("--chunk-size", type=int, default=10000)
+    export_parser.set_defaults(handler=export_command, file_formats=EXPORT_FORMATS,
+                               stdio_format="csv")
+    
+    calculate_parser = commands.add_parser("calculate",
+                                           help="EMI and interest of a loan, without a database")
+    calculate_parser.add_argument("principal_amount", type=float)
+    calculate_parser.add_argument("interest_rate", type=float, help="annual rate in percent")
+    calculate_parser.add_argument("loan_term", type=int, help="term in months")
+    calculate_parser.set_defaults(handler=calculate_command, needs_repository=False)
+    
+    backfill_parser = commands.add_parser("backfill-terms",
+                                          help="store EMI and interest on loans that lack them")
+    backfill_parser.add_argument("--batch-size", type=int, default=10000)
+    backfill_parser.set_defaults(handler=backfill_terms_command)
     
+    job_parser = commands.add_parser("job",
+                                     help="run a month-end job over the book in parallel shards")
+    job_parser.add_argument("job", choices=sorted(JOBS))
+    job_parser.add_argument("--workers", type=int, help="worker processes (default: CPUs)")
+    job_parser.add_argument("--shards", type=int, help="loan_id ranges (default: 4 per worker)")
+    job_parser.add_argument("--page-size", type=int, default=1000)
+    job_parser.add_argument("--output-dir", help="outputs and resume state (default: jobs/JOB)")
+    job_parser.add_argument("--status", default="Pending",
+                            help="loans the rescore job decides; 'all' re-scores every loan, "
+                                 "including approved ones (default: Pending)")
+    job_parser.add_argument("--restart", action="store_true",
+                            help="plan afresh instead of resuming an unfinished run")
+    job_parser.set_defaults(handler=job_command, needs_repository=False)
+    
+    args = parser.parse_args(argv)
+    # Settle the file format up front, so a missing or unknown extension is
+    # a usage error rather than a traceback once the database is open. "-"
+    # has no extension and defaults to the command's stdio format.
+    if getattr(args, 'file_formats', None):
+        if args.file == "-":
+            args.format = args.format or args.stdio_format
+        else:
+            try:
+                args.format = LoanFileUtil.file_format(args.file, args.format, args.file_formats)
+            except ValueError as e:
+                parser.error(str(e))
+    return args
+
+def report(command, count, start):
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed > 0 else 0
+    print(f"{command}: {count} loans in {elapsed:.2f}s ({rate:.0f}/s)", file=sys.stderr)
+
+def read_loan_ids(values):
+    # Yields the ids as given; parse_loan_id turns each into an int, so a
+    # malformed one is reported on its own line rather than ending the run.
+    for value in values:
+        if value == "-":
+            for line in sys.stdin:
+                if line.strip():
+                    yield line.split()[0]
+        else:
+            yield value
+
+def parse_loan_id(value):
+    try:
+        return int(value)
+    except ValueError:
+        raise InvalidLoanException(f"Invalid loan id: {value!r}")
+
+def apply_command(loan_repo, args):
+    start = time.perf_counter()
+    file_format = args.format
+    f = sys.stdin if args.file == "-" else open(args.file, newline="")
+    count = 0
+    rejected = []
+    def counted(loans):
+        nonlocal count
+        for loan in loans:
+            count += 1
+            yield loan
+    try:
+        loans = LoanFileUtil.read_loans(f, file_format, rejected)
+        failures = loan_repo.apply_loans(counted(loans), batch_size=args.batch_size)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+    for record_number, error in rejected:
+        print(f"record {record_number}\tfailed\t{error}", file=sys.stderr)
+    for loan, error in failures:
+        print(f"{loan.loan_id}\tfailed\t{error}", file=sys.stderr)
+    report("apply", count - len(failures), start)
+    return 1 if failures or rejected else 0
+
+def list_command(loan_repo, args):
+    start = time.perf_counter()
+    count = LoanExporter.export(loan_repo, sys.stdout, args.format, args.chunk_size)
+    sys.stdout.flush()
+    report("list", count, start)
+    return 0
+
+def emi_command(loan_repo, args):
+    start = time.perf_counter()
+    count = 0
+    errors = 0
+    for value in read_loan_ids(args.loan_ids):
+        try:
+            loan_id = parse_loan_id(value)
+            print(f"{loan_id}\t{loan_repo.calculate_emi(loan_id):.2f}")
+            count += 1
+        except InvalidLoanException as e:
+            print(f"{value}\terror\t{e}", file=sys.stderr)
+            errors += 1
+    report("emi", count, start)
+    return 1 if errors else 0
+
+def status_command(loan_repo, args):
+    start = time.perf_counter()
+    count = 0
+    errors = 0
+    for value in read_loan_ids(args.loan_ids):
+        try:
+            loan_id = parse_loan_id(value)
+            print(f"{loan_id}\t{loan_repo.loan_status(loan_id)}")
+            count += 1
+        except InvalidLoanException as e:
+            print(f"{value}\terror\t{e}", file=sys.stderr)
+            errors += 1
+    report("status", count, start)
+    return 1 if errors else 0
+
+def export_command(loan_repo, args):
+    start = time.perf_counter()
+    file_format = args.format
+    f = LoanExporter.open_output(args.file, file_format)
+    try:
+        count = LoanExporter.export(loan_repo, f, file_format, args.chunk_size)
+    finally:
+        if args.file != "-":
+            f.close()
+        else:
+            f.flush()
+    report("export", count, start)
+    return 0
+
+def calculate_command(loan_repo, args):
+    emi = LoanCalculator.emi_amount(args.principal_amount, args.interest_rate, args.loan_term)
+    interest = LoanCalculator.interest_amount(args.principal_amount, args.interest_rate,
+                                              args.loan_term)
+    print(f"EMI: {emi:.2f} per month")
+    print(f"Interest: {interest:.2f}")
+    return 0
+
+def backfill_terms_command(loan_repo, args):
+    start = time.perf_counter()
+    count = loan_repo.backfill_loan_terms(args.batch_size)
+    report("backfill-terms", count, start)
+    return 0
+
+def job_command(loan_repo, args):
+    # Workers open their own repositories from args.config.
+    start = time.perf_counter()
+    try:
+        runner = ShardRunner(args.job, args.config, args.output_dir, args.workers, args.shards,
+                             args.page_size, None if args.status == "all" else args.status)
+        totals = runner.run(restart=args.restart)
+    except ValueError as e:
+        print(f"{args.job}: {e}", file=sys.stderr)
+        return 1
+    for key, value in totals.items():
+        print(f"{key}\t{value}")
+    report(args.job, totals.get('loans', 0), start)
+    return 0
+
+def menu(loan_repo):
     while True:
         print("\nLoan Management System")
         print("1. Apply for Loan")
@@ -77,14 +298,15 @@ def apply_loan_menu(loan_repo):
     loan_repo.apply_loan(loan)
 
 def display_all_loans(loan_repo):
-    loans = loan_repo.get_all_loans()
-    if not loans:
+    found = False
+    for loan in loan_repo.iter_loans():
+        if not found:
+            print("\nAll Loans:")
+            found = True
+        loan.print_info()
+        print("----------------------")
+    if not found:
         print("No loans found.")
-    else:
-        print("\nAll Loans:")
-        for loan in loans:
-            loan.print_info()
-            print("----------------------")
 
 def get_loan_by_id_menu(loan_repo):
     loan_id = int(input("\nEnter Loan ID: "))
@@ -0,0 +1,75 @@
+import threading
+import time
+import unittest
+from unittest import mock
+import mysql.connector
+from util.db_conn_util import ConnectionPool, DBConnUtil
+
+
+class StubConnection:
+    in_transaction = False
+
+    def __init__(self):
+        self.dead = False
+        self.closed = False
+
+    def ping(self, **kwargs):
+        if self.dead:
+            raise mysql.connector.Error("Lost connection")
+
+    def rollback(self):
+        if self.dead:
+            raise mysql.connector.Error("Lost connection")
+
+    def close(self):
+        self.closed = True
+
+
+class ConnectionPoolTest(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(DBConnUtil, 'get_connection',
+                                    staticmethod(lambda params: StubConnection()))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_recent_connection_is_not_pinged(self):
+        pool = ConnectionPool({'ping_interval': 30})
+        for _ in range(3):
+            with pool.connection():
+                pass
+        self.assertEqual(pool.pings, 0)
+
+    def test_discarded_connection_wakes_a_waiter(self):
+        pool = ConnectionPool({'pool_size': 1, 'pool_timeout': 2})
+        borrowed = threading.Event()
+        waited = []
+
+        def lose_connection():
+            with self.assertRaises(RuntimeError):
+                with pool.connection() as connection:
+                    borrowed.set()
+                    time.sleep(0.2)
+                    connection.dead = True
+                    raise RuntimeError("query failed")
+
+        def wait_for_connection():
+            borrowed.wait()
+            start = time.monotonic()
+            with pool.connection() as connection:
+                waited.append((time.monotonic() - start, connection))
+
+        threads = [threading.Thread(target=lose_connection),
+                   threading.Thread(target=wait_for_connection)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        seconds, connection = waited[0]
+        self.assertLess(seconds, 1)
+        self.assertFalse(connection.dead)
+        self.assertEqual(pool._opened, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+from dao.memory_loan_repository_impl import InMemoryLoanRepositoryImpl
+from dao.sqlite_loan_repository_impl import SQLiteLoanRepositoryImpl
+from entities.car_loan import CarLoan
+from entities.customer import Customer
+
+
+def car_loan(loan_id, credit_score, loan_status="Pending"):
+    customer = Customer(loan_id, f"Customer {loan_id}", "c@example.com", "9000000000",
+                        "Chennai", credit_score)
+    return CarLoan(loan_id, customer, 100000, 8.5, 12, loan_status, "Hatchback", 120000)
+
+
+class DecideLoansTest(unittest.TestCase):
+    def repositories(self):
+        return (SQLiteLoanRepositoryImpl(), InMemoryLoanRepositoryImpl())
+
+    def test_decides_pending_loans_in_range_only(self):
+        for repo in self.repositories():
+            with self.subTest(repo=type(repo).__name__):
+                repo.apply_loans([car_loan(1, 800), car_loan(2, 500),
+                                  car_loan(3, 500, "Approved"), car_loan(4, 800)])
+                decided = repo.decide_loans(loan_id_range=(1, 3))
+                self.assertEqual(decided, {'Approved': 1, 'Rejected': 1})
+                statuses = {loan.loan_id: loan.loan_status for loan in repo.get_all_loans()}
+                self.assertEqual(statuses, {1: "Approved", 2: "Rejected",
+                                            3: "Approved", 4: "Pending"})
+
+
+    def test_decides_by_type_and_ids(self):
+        for repo in self.repositories():
+            with self.subTest(repo=type(repo).__name__):
+                repo.apply_loans([car_loan(1, 800), car_loan(2, 500), car_loan(3, 800)])
+                self.assertEqual(repo.decide_loans(loan_type="HomeLoan"),
+                                 {'Approved': 0, 'Rejected': 0})
+                self.assertEqual(repo.decide_loans(loan_ids=[]), {'Approved': 0, 'Rejected': 0})
+                self.assertEqual(repo.decide_loans(loan_type="CarLoan", loan_ids=[2, 3]),
+                                 {'Approved': 1, 'Rejected': 1})
+                self.assertEqual(repo.get_loan_by_id(1).loan_status, "Pending")
+                self.assertEqual(repo.decide_loans(loan_status=None),
+                                 {'Approved': 2, 'Rejected': 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
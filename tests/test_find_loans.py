@@ -0,0 +1,54 @@
+import unittest
+from dao.memory_loan_repository_impl import InMemoryLoanRepositoryImpl
+from dao.sqlite_loan_repository_impl import SQLiteLoanRepositoryImpl
+from entities.car_loan import CarLoan
+from entities.customer import Customer
+from entities.home_loan import HomeLoan
+
+
+def loans():
+    alice = Customer(1, "Alice", "alice@example.com", "9000000001", "Chennai", 720)
+    bob = Customer(2, "Bob", "bob@example.com", "9000000002", "Madurai", 610)
+    return [
+        CarLoan(1, alice, 300000, 9.0, 36, "Approved", "Sedan", 400000),
+        HomeLoan(2, alice, 2500000, 7.5, 240, "Pending", "12 Beach Road", 4000000),
+        CarLoan(3, bob, 150000, 10.5, 24, "Pending", "Hatchback", 200000),
+        HomeLoan(4, bob, 1800000, 8.0, 180, "Rejected", "4 Lake View", 2600000)
+    ]
+
+
+class FindLoansTest(unittest.TestCase):
+    def repositories(self):
+        return (SQLiteLoanRepositoryImpl(), InMemoryLoanRepositoryImpl())
+
+    def test_filters_combine(self):
+        for repo in self.repositories():
+            with self.subTest(repo=type(repo).__name__):
+                repo.apply_loans(loans())
+                found = repo.find_loans({'customer_id': 2, 'loan_type': "HomeLoan"})
+                self.assertEqual([loan.loan_id for loan in found], [4])
+                self.assertEqual(found[0].property_address, "4 Lake View")
+                self.assertEqual(found[0].customer.name, "Bob")
+
+                found = repo.find_loans({'min_principal': 200000, 'max_principal': 2000000,
+                                         'loan_status': None})
+                self.assertEqual([loan.loan_id for loan in found], [1, 4])
+
+    def test_order_and_limit(self):
+        for repo in self.repositories():
+            with self.subTest(repo=type(repo).__name__):
+                repo.apply_loans(loans())
+                found = repo.find_loans(order_by="-principal_amount", limit=2)
+                self.assertEqual([loan.loan_id for loan in found], [2, 4])
+
+    def test_rejects_unknown_filter_and_order(self):
+        for repo in self.repositories():
+            with self.subTest(repo=type(repo).__name__):
+                with self.assertRaises(ValueError):
+                    repo.find_loans({'car_model': "Sedan"})
+                with self.assertRaises(ValueError):
+                    repo.find_loans(order_by="name")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,25 @@
+import unittest
+from dao.loan_cache import LoanCache
+
+
+class LoanCacheTest(unittest.TestCase):
+    def test_invalidate_customer_drops_all_their_loans(self):
+        cache = LoanCache()
+        cache.put(1, {'loan_id': 1}, customer_id=10)
+        cache.put(2, {'loan_id': 2}, customer_id=10)
+        cache.put(3, {'loan_id': 3}, customer_id=20)
+        cache.invalidate_customer(10)
+        self.assertIsNone(cache.get(1))
+        self.assertIsNone(cache.get(2))
+        self.assertEqual(cache.get(3), {'loan_id': 3})
+
+    def test_evicted_loans_leave_the_customer_index(self):
+        cache = LoanCache(max_entries=1)
+        cache.put(1, {'loan_id': 1}, customer_id=10)
+        cache.put(2, {'loan_id': 2}, customer_id=20)
+        self.assertEqual(cache.stats()['evictions'], 1)
+        self.assertEqual(cache._by_customer, {20: {2}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import io
+import unittest
+from dao.memory_loan_repository_impl import InMemoryLoanRepositoryImpl
+from dao.sqlite_loan_repository_impl import SQLiteLoanRepositoryImpl
+from entities.car_loan import CarLoan
+from entities.customer import Customer
+from entities.home_loan import HomeLoan
+from util.loan_exporter import LoanExporter
+from util.loan_file_util import LoanFileUtil
+
+
+def loans():
+    alice = Customer(1, "Alice, Jr.", "alice@example.com", "9000000001", "Chennai", 720)
+    bob = Customer(2, "Bob", "bob@example.com", "9000000002", "Madurai", 610)
+    return [
+        CarLoan(1, alice, 300000, 9.25, 36, "Approved", "Sedan", 400000),
+        HomeLoan(2, alice, 2500000, 7.5, 240, "Pending", "12 Beach Road", 4000000),
+        CarLoan(3, bob, 150000, 10.5, 24, "Rejected", "Hatchback", 200000)
+    ]
+
+
+def fields(loan):
+    customer = loan.customer
+    return (loan.loan_id, loan.loan_type, loan.loan_status, float(loan.principal_amount),
+            float(loan.interest_rate), loan.loan_term, customer.customer_id, customer.name,
+            customer.credit_score, getattr(loan, 'property_address', None),
+            getattr(loan, 'car_model', None))
+
+
+class LoanExporterTest(unittest.TestCase):
+    def repositories(self):
+        return (SQLiteLoanRepositoryImpl(), InMemoryLoanRepositoryImpl())
+
+    def test_export_reads_back_as_the_same_loans(self):
+        for file_format in ('csv', 'jsonl'):
+            for repo in self.repositories():
+                with self.subTest(repo=type(repo).__name__, file_format=file_format):
+                    repo.apply_loans(loans())
+                    f = io.StringIO()
+                    count = LoanExporter.export(repo, f, file_format, chunk_size=2)
+                    self.assertEqual(count, 3)
+
+                    f.seek(0)
+                    exported = list(LoanFileUtil.read_loans(f, file_format))
+                    self.assertEqual([fields(loan) for loan in exported],
+                                     [fields(loan) for loan in loans()])
+
+                    copy = type(repo)()
+                    self.assertEqual(copy.apply_loans(exported), [])
+                    self.assertEqual([fields(loan) for loan in copy.get_all_loans()],
+                                     [fields(loan) for loan in repo.get_all_loans()])
+
+
+if __name__ == "__main__":
+    unittest.main()
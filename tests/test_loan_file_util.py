@@ -0,0 +1,26 @@
+import io
+import unittest
+from util.loan_file_util import LoanFileUtil
+
+RECORDS = """\
+{"loan_id": 1, "customer_id": 1, "credit_score": 700, "principal_amount": 100000, "interest_rate": 8.5, "loan_term": 12, "loan_type": "CarLoan", "car_value": 120000}
+{"loan_id": 2, "customer_id": 1, "credit_score": "abc", "principal_amount": 100000, "interest_rate": 8.5, "loan_term": 12, "loan_type": "CarLoan", "car_value": 120000}
+{not json
+{"loan_id": 4, "customer_id": 1, "credit_score": 700, "principal_amount": 100000, "interest_rate": 8.5, "loan_term": 12, "loan_type": "CarLoan", "car_value": 120000}
+"""
+
+
+class LoanFileUtilTest(unittest.TestCase):
+    def test_malformed_records_are_rejected_and_skipped(self):
+        rejected = []
+        loans = list(LoanFileUtil.read_loans(io.StringIO(RECORDS), 'jsonl', rejected))
+        self.assertEqual([loan.loan_id for loan in loans], [1, 4])
+        self.assertEqual([record_number for record_number, _ in rejected], [2, 3])
+
+    def test_malformed_record_raises_without_rejected_list(self):
+        with self.assertRaises(ValueError):
+            list(LoanFileUtil.read_loans(io.StringIO(RECORDS), 'jsonl'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+from dao.loan_write_queue import LoanWriteQueue
+from dao.memory_loan_repository_impl import InMemoryLoanRepositoryImpl
+from dao.sqlite_loan_repository_impl import SQLiteLoanRepositoryImpl
+from entities.car_loan import CarLoan
+from entities.customer import Customer
+from exceptions.invalid_loan_exception import InvalidLoanException
+
+
+def car_loan(loan_id, loan_term=12):
+    customer = Customer(1, "Customer 1", "c1@example.com", "9000000000", "Chennai", 700)
+    return CarLoan(loan_id, customer, 100000, 8.5, loan_term, "Pending", "Hatchback", 120000)
+
+
+class LoanTermsTest(unittest.TestCase):
+    def repositories(self):
+        return (SQLiteLoanRepositoryImpl(), InMemoryLoanRepositoryImpl())
+
+    def test_invalid_term_fails_only_that_loan(self):
+        for repo in self.repositories():
+            with self.subTest(repo=type(repo).__name__):
+                loans = [car_loan(1), car_loan(2, loan_term=0), car_loan(3)]
+                failures = repo.apply_loans(loans)
+                self.assertEqual([loan.loan_id for loan, _ in failures], [2])
+                self.assertEqual([loan.loan_id for loan in repo.get_all_loans()], [1, 3])
+
+    def test_write_queue_fails_only_the_invalid_loan(self):
+        repo = SQLiteLoanRepositoryImpl()
+        write_queue = LoanWriteQueue(repo, max_delay=0.05)
+        futures = [write_queue.submit(loan)
+                   for loan in (car_loan(1), car_loan(2, loan_term=0), car_loan(3))]
+        write_queue.close()
+        self.assertEqual(futures[0].result(), 1)
+        self.assertRaises(InvalidLoanException, futures[1].result)
+        self.assertEqual(futures[2].result(), 3)
+
+    def test_backfill_skips_invalid_terms(self):
+        repo = SQLiteLoanRepositoryImpl()
+        repo.apply_loans([car_loan(1), car_loan(2), car_loan(3)])
+        repo.connection.execute("UPDATE Loan SET loan_term = 0 WHERE loan_id = 2")
+        repo.connection.execute("UPDATE Loan SET emi_amount = NULL, total_interest = NULL, "
+                                "total_payable = NULL")
+        repo.connection.commit()
+        self.assertEqual(repo.backfill_loan_terms(batch_size=1), 2)
+        self.assertAlmostEqual(repo.calculate_emi(3), 8721.98)
+        self.assertRaises(InvalidLoanException, repo.calculate_emi, 2)
+
+    def test_total_payable_is_emi_over_the_term(self):
+        repo = SQLiteLoanRepositoryImpl()
+        repo.apply_loans([car_loan(1)])
+        row = repo.connection.execute(
+            "SELECT emi_amount, total_payable FROM Loan WHERE loan_id = 1").fetchone()
+        self.assertEqual(tuple(row), (8721.98, 104663.76))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,27 @@
+import unittest
+from dao.loan_write_queue import LoanWriteQueue
+from dao.sqlite_loan_repository_impl import SQLiteLoanRepositoryImpl
+from entities.car_loan import CarLoan
+from entities.customer import Customer
+
+
+def car_loan(loan_id):
+    customer = Customer(1, "Customer 1", "c1@example.com", "9000000000", "Chennai", 700)
+    return CarLoan(loan_id, customer, 100000, 8.5, 12, "Pending", "Hatchback", 120000)
+
+
+class LoanWriteQueueTest(unittest.TestCase):
+    def test_enqueued_loan_rejected_later_is_logged_and_counted(self):
+        repo = SQLiteLoanRepositoryImpl()
+        write_queue = LoanWriteQueue(repo, durability='enqueue')
+        with self.assertLogs('dao.loan_write_queue', 'ERROR') as logs:
+            self.assertFalse(write_queue.apply(car_loan(1)))
+            self.assertFalse(write_queue.apply(car_loan(1)))
+            write_queue.close()
+        self.assertEqual(write_queue.failed, 1)
+        self.assertIn("Queued loan 1 was not applied", logs.output[0])
+        self.assertEqual([loan.loan_id for loan in repo.get_all_loans()], [1])
+
+
+if __name__ == "__main__":
+    unittest.main()
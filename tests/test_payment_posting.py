@@ -0,0 +1,78 @@
+import unittest
+from dao.memory_loan_repository_impl import InMemoryLoanRepositoryImpl
+from dao.sqlite_loan_repository_impl import SQLiteLoanRepositoryImpl
+from entities.car_loan import CarLoan
+from entities.customer import Customer
+from entities.payment import Payment
+
+
+def zero_rate_loan():
+    # 50000 at 0% over 24 months: the EMI of 2083.333... is stored as 2083.33.
+    customer = Customer(1, "Customer 1", "c1@example.com", "9000000000", "Chennai", 700)
+    return CarLoan(2, customer, 50000, 0, 24, "Pending", "Hatchback", 60000)
+
+
+class PaymentPostingTest(unittest.TestCase):
+    def repositories(self):
+        return (SQLiteLoanRepositoryImpl(), InMemoryLoanRepositoryImpl())
+
+    def test_paying_the_emi_shown_covers_one_emi(self):
+        for repo in self.repositories():
+            with self.subTest(repo=type(repo).__name__):
+                repo.apply_loans([zero_rate_loan()])
+                emi = repo.calculate_emi(2)
+                self.assertEqual(emi, 2083.33)
+
+                payment = Payment("ref-1", 2, emi)
+                result = repo.post_payments([payment])
+                self.assertEqual(result['rejected'], [])
+                self.assertEqual(payment.emis_paid, 1)
+                self.assertEqual(payment.remaining_emis, 23)
+
+    def test_final_instalment_clears_the_balance(self):
+        # 23 EMIs of 2083.33 leave 2083.41, which the final instalment must
+        # cover in full; no payment is booked for more than its amount.
+        for repo in self.repositories():
+            with self.subTest(repo=type(repo).__name__):
+                repo.apply_loans([zero_rate_loan()])
+                emi = repo.calculate_emi(2)
+                payments = [Payment(f"ref-{month}", 2, emi) for month in range(23)]
+                result = repo.post_payments(payments)
+                self.assertEqual(result['posted'], 23)
+                self.assertEqual(payments[-1].outstanding_balance, 2083.41)
+
+                short = Payment("ref-short", 2, emi)
+                result = repo.post_payments([short])
+                self.assertEqual(result['posted'], 0)
+                self.assertEqual(len(result['rejected']), 1)
+
+                final = Payment("ref-final", 2, payments[-1].outstanding_balance)
+                result = repo.post_payments([final])
+                self.assertEqual(result['posted'], 1)
+                self.assertEqual(final.remaining_emis, 0)
+                self.assertEqual(final.outstanding_balance, 0)
+                for payment in payments + [final]:
+                    self.assertLessEqual(round(payment.principal_paid + payment.interest_paid, 2),
+                                         payment.amount)
+
+
+    def test_reposted_references_are_duplicates(self):
+        # A reference is posted once: repeated within a batch, or sent again
+        # in a later run, it is counted as a duplicate and moves nothing.
+        for repo in self.repositories():
+            with self.subTest(repo=type(repo).__name__):
+                repo.apply_loans([zero_rate_loan()])
+                emi = repo.calculate_emi(2)
+                result = repo.post_payments([Payment("ref-1", 2, emi), Payment("ref-1", 2, emi),
+                                             Payment("ref-2", 2, emi)])
+                self.assertEqual((result['posted'], result['duplicates']), (2, 1))
+
+                result = repo.post_payments([Payment("ref-2", 2, emi), Payment("ref-3", 2, emi)])
+                self.assertEqual((result['posted'], result['duplicates']), (1, 1))
+                self.assertEqual([payment.payment_reference for payment in repo.get_payments(2)],
+                                 ["ref-1", "ref-2", "ref-3"])
+                self.assertEqual(repo.get_payments(2)[-1].remaining_emis, 21)
+
+
+if __name__ == "__main__":
+    unittest.main()
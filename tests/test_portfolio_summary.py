@@ -0,0 +1,54 @@
+import unittest
+from dao.memory_loan_repository_impl import InMemoryLoanRepositoryImpl
+from dao.sqlite_loan_repository_impl import SQLiteLoanRepositoryImpl
+from entities.car_loan import CarLoan
+from entities.customer import Customer
+from entities.home_loan import HomeLoan
+from entities.payment import Payment
+
+
+def loans():
+    customer = Customer(1, "Customer 1", "c1@example.com", "9000000000", "Chennai", 700)
+    return [
+        CarLoan(1, customer, 120000, 12.0, 12, "Approved", "Sedan", 150000),
+        CarLoan(2, customer, 60000, 6.0, 24, "Rejected", "Hatchback", 80000),
+        HomeLoan(3, customer, 1000000, 9.0, 120, "Pending", "1 Main Road", 1500000)
+    ]
+
+
+class PortfolioSummaryTest(unittest.TestCase):
+    def repositories(self):
+        return (SQLiteLoanRepositoryImpl(), InMemoryLoanRepositoryImpl())
+
+    def test_totals_by_type_and_status(self):
+        for repo in self.repositories():
+            with self.subTest(repo=type(repo).__name__):
+                repo.apply_loans(loans())
+                summary = repo.get_portfolio_summary()
+
+                car = summary['by_type']['CarLoan']
+                self.assertEqual(car['loans'], 2)
+                self.assertEqual(car['principal_amount'], 180000)
+                self.assertEqual(car['average_interest_rate'], 9.0)
+                self.assertAlmostEqual(car['projected_interest'], 14400 + 7200)
+                self.assertEqual(car['by_status'], {'Pending': 0, 'Approved': 1, 'Rejected': 1})
+                self.assertEqual(car['approval_rate'], 0.5)
+
+                total = summary['total']
+                self.assertEqual(total['loans'], 3)
+                self.assertEqual(total['outstanding_principal'], 120000)
+                self.assertEqual(summary['by_type']['HomeLoan']['approval_rate'], None)
+
+    def test_outstanding_principal_falls_with_repayments(self):
+        for repo in self.repositories():
+            with self.subTest(repo=type(repo).__name__):
+                repo.apply_loans(loans())
+                payment = Payment("ref-1", 1, repo.calculate_emi(1))
+                repo.post_payments([payment])
+                summary = repo.get_portfolio_summary()
+                self.assertAlmostEqual(summary['total']['outstanding_principal'],
+                                       payment.outstanding_balance)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import numpy as np
+from util.loan_calculator import LoanCalculator
+from util.portfolio_calculator import PortfolioCalculator
+
+SCHEDULE_COLUMNS = ('loan_id', 'month', 'opening_balance', 'interest',
+                    'principal', 'closing_balance')
+
+
+# Month-by-month split of each EMI into interest and principal. The single
+# loan generator and the batch version run the same recurrence, so they
+# produce identical figures; the last month absorbs the rounding drift so
+# every schedule closes at exactly zero.
+class AmortizationSchedule:
+    @staticmethod
+    def iter_schedule(principal_amount, interest_rate, loan_term):
+        emi = LoanCalculator.emi_amount(principal_amount, interest_rate, loan_term)
+        monthly_rate = interest_rate / 12 / 100
+        balance = principal_amount
+        for month in range(1, loan_term + 1):
+            interest = balance * monthly_rate
+            principal = balance if month == loan_term else emi - interest
+            closing = balance - principal
+            yield month, balance, interest, principal, closing
+            balance = closing
+
+    @staticmethod
+    def schedule_columns(loan_ids, principal_amounts, interest_rates, loan_terms):
+        loan_id = np.asarray(loan_ids, dtype=np.int64)
+        principal_amount = np.asarray(principal_amounts, dtype=np.float64)
+        interest_rate = np.asarray(interest_rates, dtype=np.float64)
+        loan_term = np.asarray(loan_terms, dtype=np.int64)
+
+        emi = PortfolioCalculator.emi_amounts(principal_amount, interest_rate, loan_term)
+        monthly_rate = interest_rate / 12 / 100
+        max_term = int(loan_term.max()) if loan_term.size else 0
+
+        # One row per loan, one column per month; months past a loan's term
+        # are masked out when the matrix is flattened.
+        shape = (loan_id.size, max_term)
+        opening = np.zeros(shape)
+        interest = np.zeros(shape)
+        principal = np.zeros(shape)
+        balance = principal_amount.copy()
+        for month in range(1, max_term + 1):
+            column = month - 1
+            opening[:, column] = balance
+            interest[:, column] = balance * monthly_rate
+            principal[:, column] = np.where(loan_term == month, balance,
+                                            emi - interest[:, column])
+            balance = balance - principal[:, column]
+
+        months = np.arange(1, max_term + 1, dtype=np.int32)
+        active = months[np.newaxis, :] <= loan_term[:, np.newaxis]
+        return {
+            'loan_id': np.repeat(loan_id, loan_term),
+            'month': np.broadcast_to(months, shape)[active],
+            'opening_balance': opening[active],
+            'interest': interest[active],
+            'principal': principal[active],
+            'closing_balance': (opening - principal)[active]
+        }
+
+    @staticmethod
+    def write_schedules(columns, path, chunk_size=2000):
+        # Schedules are written as a directory of compressed .npz parts, one
+        # per chunk of loans, so a whole book never has to be in memory at
+        # once. Returns the number of schedule rows written.
+        os.makedirs(path, exist_ok=True)
+        rows = 0
+        part = 0
+        for start in range(0, len(columns['loan_id']), chunk_size):
+            end = start + chunk_size
+            chunk = AmortizationSchedule.schedule_columns(
+                columns['loan_id'][start:end],
+                columns['principal_amount'][start:end],
+                columns['interest_rate'][start:end],
+                columns['loan_term'][start:end])
+            np.savez_compressed(os.path.join(path, f"part-{part:05d}.npz"), **chunk)
+            rows += len(chunk['loan_id'])
+            part += 1
+        return rows
+
+    @staticmethod
+    def read_schedules(path):
+        for name in sorted(os.listdir(path)):
+            if name.startswith("part-") and name.endswith(".npz"):
+                with np.load(os.path.join(path, name)) as part:
+                    yield {column: part[column] for column in SCHEDULE_COLUMNS}
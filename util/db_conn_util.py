@@ -1,5 +1,11 @@
-import mysql.connector
+import sys
+import threading
+import time
+from contextlib import contextmanager
 from util.db_property_util import DBPropertyUtil
+from util.lazy_module import lazy_import
+
+mysql = lazy_import("mysql.connector")
 
 class DBConnUtil:
     @staticmethod
@@ -12,8 +18,124 @@ class DBConnUtil:
                 user=connection_params['user'],
                 password=connection_params['password']
             )
-            print("Database connection established successfully")
+            # stderr, so it never mixes into results a command writes to stdout.
+            print("Database connection established successfully", file=sys.stderr)
             return connection
         except mysql.connector.Error as err:
-            print(f"Error connecting to MySQL: {err}")
-            raise
\ No newline at end of file
+            print(f"Error connecting to MySQL: {err}", file=sys.stderr)
+            raise
+
+    @staticmethod
+    def get_pool(connection_params):
+        return ConnectionPool(connection_params)
+
+
+# Thread-safe pool of MySQL connections. Connections are opened lazily up to
+# pool_size. A connection that sat idle for ping_interval seconds or more is
+# pinged on checkout and reconnected if the server dropped it, so a restarted
+# database or an expired wait_timeout does not take the process down;
+# connections used more recently skip the round trip. One that fails mid-use
+# is closed rather than returned, and a caller waiting for a connection is
+# woken to open a fresh one in its place.
+class ConnectionPool:
+    def __init__(self, connection_params):
+        self.connection_params = connection_params
+        self.pool_size = connection_params.get('pool_size', 5)
+        self.pool_timeout = connection_params.get('pool_timeout', 30)
+        self.reconnect_attempts = connection_params.get('reconnect_attempts', 3)
+        self.reconnect_delay = connection_params.get('reconnect_delay', 1)
+        self.ping_interval = connection_params.get('ping_interval', 30)
+        self.pings = 0
+        # (connection, time it was returned) pairs, most recent last.
+        self._idle = []
+        self._opened = 0
+        self._lock = threading.Lock()
+        # Notified whenever a connection is returned or closed, i.e. when a
+        # waiting caller may take one or open one.
+        self._available = threading.Condition(self._lock)
+
+    @contextmanager
+    def connection(self):
+        connection = self._checkout()
+        try:
+            yield connection
+        except BaseException:
+            self._discard_or_rollback(connection)
+            raise
+        else:
+            # End the snapshot a read-only operation left open, otherwise the
+            # next borrower would keep reading data as of that moment.
+            if connection.in_transaction:
+                self._discard_or_rollback(connection)
+            else:
+                self._release(connection)
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection, _ in idle:
+            self._close(connection)
+
+    def _checkout(self):
+        deadline = time.monotonic() + self.pool_timeout
+        with self._available:
+            while not self._idle and self._opened >= self.pool_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise mysql.connector.errors.PoolError(
+                        f"No connection available within {self.pool_timeout}s "
+                        f"(pool size {self.pool_size})")
+                self._available.wait(remaining)
+            if not self._idle:
+                self._opened += 1
+                connection = None
+            else:
+                connection, released = self._idle.pop()
+        if connection is None:
+            return self._open()
+        if time.monotonic() - released < self.ping_interval:
+            return connection
+        return self._healthy(connection)
+
+    def _open(self):
+        try:
+            return DBConnUtil.get_connection(self.connection_params)
+        except mysql.connector.Error:
+            self._forget()
+            raise
+
+    def _healthy(self, connection):
+        with self._lock:
+            self.pings += 1
+        try:
+            connection.ping(reconnect=True, attempts=self.reconnect_attempts,
+                            delay=self.reconnect_delay)
+            return connection
+        except mysql.connector.Error:
+            self._close(connection)
+            raise
+
+    def _release(self, connection):
+        with self._available:
+            self._idle.append((connection, time.monotonic()))
+            self._available.notify()
+
+    def _discard_or_rollback(self, connection):
+        try:
+            connection.rollback()
+            self._release(connection)
+        except mysql.connector.Error:
+            self._close(connection)
+
+    def _close(self, connection):
+        try:
+            connection.close()
+        except mysql.connector.Error:
+            pass
+        self._forget()
+
+    def _forget(self):
+        # A connection was closed or never opened: its slot is free again.
+        with self._available:
+            self._opened -= 1
+            self._available.notify()
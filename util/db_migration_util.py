@@ -0,0 +1,65 @@
+import os
+import sys
+from util.db_property_util import DBPropertyUtil
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "..", "db", "migrations")
+
+# Applies db/migrations/*.sql on top of db/schema.sql in file name order and
+# records each one in SchemaMigration, so running it again is a no-op. MySQL
+# commits DDL implicitly, so a migration that fails halfway has to be
+# finished by hand before it can be recorded.
+class DBMigrationUtil:
+    @staticmethod
+    def migrations():
+        return sorted(name for name in os.listdir(MIGRATIONS_DIR) if name.endswith(".sql"))
+
+    @staticmethod
+    def apply_migrations(connection, placeholder="%s"):
+        applied = []
+        cursor = connection.cursor()
+        try:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS SchemaMigration (
+                    version VARCHAR(100) PRIMARY KEY,
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            cursor.execute("SELECT version FROM SchemaMigration")
+            done = {row[0] for row in cursor.fetchall()}
+
+            for version in DBMigrationUtil.migrations():
+                if version in done:
+                    continue
+                with open(os.path.join(MIGRATIONS_DIR, version)) as f:
+                    script = f.read()
+                for statement in script.split(";"):
+                    lines = [line for line in statement.splitlines()
+                             if not line.strip().startswith("--")]
+                    if "".join(lines).strip():
+                        cursor.execute("\n".join(lines))
+                cursor.execute(f"INSERT INTO SchemaMigration (version) VALUES ({placeholder})",
+                               (version,))
+                connection.commit()
+                applied.append(version)
+        finally:
+            cursor.close()
+        return applied
+
+
+def main():
+    # python -m util.db_migration_util [property_file]
+    from util.db_conn_util import DBConnUtil
+    property_file = sys.argv[1] if len(sys.argv) > 1 else "config.ini"
+    connection = DBConnUtil.get_connection(DBPropertyUtil.get_connection_string(property_file))
+    try:
+        applied = DBMigrationUtil.apply_migrations(connection)
+    finally:
+        connection.close()
+    if applied:
+        print(f"Applied migrations: {', '.join(applied)}")
+    else:
+        print("Database schema is up to date.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,112 @@
 import configparser
+import os
+import threading
+
+_configs = {}
+_configs_lock = threading.Lock()
 
 class DBPropertyUtil:
     @staticmethod
-    def get_connection_string(property_file):
+    def read(property_file):
+        # A repository asks for several sections of the same file while it
+        # starts up; parse it once and again only when it changes on disk.
+        try:
+            modified = os.stat(property_file).st_mtime_ns
+        except OSError:
+            modified = None
+        with _configs_lock:
+            cached = _configs.get(property_file)
+            if cached is not None and cached[0] == modified:
+                return cached[1]
+        
         config = configparser.ConfigParser()
         config.read(property_file)
+        with _configs_lock:
+            _configs[property_file] = (modified, config)
+        return config
+    
+    @staticmethod
+    def get_connection_string(property_file):
+        config = DBPropertyUtil.read(property_file)
         
         return {
             'host': config.get('database', 'host'),
             'port': config.getint('database', 'port'),
             'database': config.get('database', 'name'),
             'user': config.get('database', 'username'),
-            'password': config.get('database', 'password')
+            'password': config.get('database', 'password'),
+            'pool_size': config.getint('database', 'pool_size', fallback=5),
+            'pool_timeout': config.getint('database', 'pool_timeout', fallback=30),
+            'reconnect_attempts': config.getint('database', 'reconnect_attempts', fallback=3),
+            'reconnect_delay': config.getint('database', 'reconnect_delay', fallback=1),
+            'ping_interval': config.getfloat('database', 'ping_interval', fallback=30)
+        }
+
+    @staticmethod
+    def get_cache_settings(property_file):
+        config = DBPropertyUtil.read(property_file)
+        
+        return {
+            'enabled': config.getboolean('cache', 'enabled', fallback=False),
+            'max_entries': config.getint('cache', 'max_entries', fallback=10000),
+            'ttl_seconds': config.getfloat('cache', 'ttl_seconds', fallback=300)
+        }
+
+    @staticmethod
+    def get_credit_rules(property_file):
+        # A loan is approved when the customer's credit score is strictly
+        # above the minimum for its loan type.
+        config = DBPropertyUtil.read(property_file)
+        
+        default = config.getint('credit', 'min_credit_score', fallback=650)
+        return {
+            'default': default,
+            'HomeLoan': config.getint('credit', 'home_loan_min_credit_score', fallback=default),
+            'CarLoan': config.getint('credit', 'car_loan_min_credit_score', fallback=default)
+        }
+
+    @staticmethod
+    def get_backend_settings(property_file):
+        config = DBPropertyUtil.read(property_file)
+        
+        return {
+            'backend': config.get('database', 'backend', fallback='mysql'),
+            'sqlite_path': config.get('database', 'sqlite_path', fallback=':memory:')
+        }
+
+    @staticmethod
+    def get_instrumentation_settings(property_file):
+        config = DBPropertyUtil.read(property_file)
+        
+        sinks = config.get('instrumentation', 'sinks', fallback='registry')
+        return {
+            'enabled': config.getboolean('instrumentation', 'enabled', fallback=False),
+            'sinks': [sink.strip() for sink in sinks.split(',') if sink.strip()],
+            'prometheus_file': config.get('instrumentation', 'prometheus_file',
+                                          fallback='loan_repository.prom'),
+            'prometheus_interval': config.getfloat('instrumentation', 'prometheus_interval',
+                                                   fallback=15)
+        }
+
+    @staticmethod
+    def get_summary_settings(property_file):
+        config = DBPropertyUtil.read(property_file)
+        
+        return {
+            'incremental': config.getboolean('portfolio', 'incremental_summary', fallback=False)
+        }
+
+    @staticmethod
+    def get_write_behind_settings(property_file):
+        config = DBPropertyUtil.read(property_file)
+        
+        # Blank full_queue_timeout: a submit waits as long as the queue is full.
+        full_queue_timeout = config.get('write_behind', 'full_queue_timeout', fallback='').strip()
+        return {
+            'enabled': config.getboolean('write_behind', 'enabled', fallback=False),
+            'max_pending': config.getint('write_behind', 'max_pending', fallback=10000),
+            'batch_size': config.getint('write_behind', 'batch_size', fallback=500),
+            'max_delay': config.getfloat('write_behind', 'max_delay_ms', fallback=0) / 1000,
+            'full_queue_timeout': float(full_queue_timeout) if full_queue_timeout else None,
+            'durability': config.get('write_behind', 'durability', fallback='commit')
         }
\ No newline at end of file
@@ -0,0 +1,308 @@
+import atexit
+import bisect
+import functools
+import inspect
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dao.loan_repository import ILoanRepository
+
+# Latency histogram bucket bounds, in seconds.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Every method of the repository interface, so new ones are recorded
+# without being listed here.
+INSTRUMENTED_METHODS = tuple(sorted(ILoanRepository.__abstractmethods__))
+
+
+# Per-name call counts, rows fetched and latency histograms. Names are
+# keyed by kind: "method" for repository calls, "sql" for statements and
+# "pool" for connection checkouts.
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def record(self, kind, name, seconds, rows=0):
+        with self._lock:
+            series = self._series.get((kind, name))
+            if series is None:
+                series = self._series[(kind, name)] = {
+                    'count': 0,
+                    'rows': 0,
+                    'sum': 0.0,
+                    'buckets': [0] * (len(LATENCY_BUCKETS) + 1)
+                }
+            series['count'] += 1
+            series['rows'] += rows
+            series['sum'] += seconds
+            series['buckets'][bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {key: {**series, 'buckets': list(series['buckets'])}
+                    for key, series in self._series.items()}
+
+    def to_prometheus(self):
+        lines = [
+            "# TYPE loan_repository_calls_total counter",
+            "# TYPE loan_repository_rows_total counter",
+            "# TYPE loan_repository_latency_seconds histogram"
+        ]
+        for (kind, name), series in sorted(self.snapshot().items()):
+            labels = f'kind="{kind}",name="{name}"'
+            lines.append(f"loan_repository_calls_total{{{labels}}} {series['count']}")
+            lines.append(f"loan_repository_rows_total{{{labels}}} {series['rows']}")
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), series['buckets']):
+                cumulative += count
+                lines.append(f'loan_repository_latency_seconds_bucket{{{labels},le="{bound}"}} '
+                             f'{cumulative}')
+            lines.append(f"loan_repository_latency_seconds_sum{{{labels}}} {series['sum']:.6f}")
+            lines.append(f"loan_repository_latency_seconds_count{{{labels}}} {series['count']}")
+        return "\n".join(lines) + "\n"
+
+
+class LogSink:
+    def __init__(self, logger_name="loan_repository.metrics"):
+        self.logger = logging.getLogger(logger_name)
+
+    def record(self, kind, name, seconds, rows):
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("%s %s took %.3f ms, %d rows", kind, name, seconds * 1000, rows)
+
+
+class RegistrySink:
+    def __init__(self, registry=None):
+        self.registry = registry if registry is not None else MetricsRegistry()
+
+    def record(self, kind, name, seconds, rows):
+        self.registry.record(kind, name, seconds, rows)
+
+
+# Rewrites a Prometheus text-format file from a registry at most once per
+# interval, for a node_exporter textfile collector to pick up, and once
+# more at exit. It only reads the registry; pair it with a RegistrySink
+# that fills it.
+class PrometheusFileSink:
+    def __init__(self, registry, path, interval_seconds=15):
+        self.registry = registry
+        self.path = path
+        self.interval_seconds = interval_seconds
+        self._written_at = time.monotonic()
+        atexit.register(self.flush)
+
+    def record(self, kind, name, seconds, rows):
+        if time.monotonic() - self._written_at >= self.interval_seconds:
+            self.flush()
+
+    def flush(self):
+        self._written_at = time.monotonic()
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w") as f:
+            f.write(self.registry.to_prometheus())
+        os.replace(temporary, self.path)
+
+
+def statement_name(sql):
+    # "SELECT Loan", "INSERT Customer", "UPDATE Loan": the verb and the
+    # first table, which is enough to tell the repository's statements apart.
+    words = sql.split()
+    verb = words[0].upper() if words else ""
+    upper = [word.upper() for word in words]
+    table = ""
+    if verb == "INSERT" and "INTO" in upper:
+        table = words[upper.index("INTO") + 1]
+    elif verb == "UPDATE" and len(words) > 1:
+        table = words[1]
+    elif "FROM" in upper:
+        table = words[upper.index("FROM") + 1]
+    return f"{verb} {table}".strip()
+
+
+class Instrumentation:
+    def __init__(self, sinks):
+        self.sinks = list(sinks)
+        self._names = {}
+
+    @staticmethod
+    def from_settings(settings):
+        sinks = []
+        names = settings['sinks']
+        unknown = set(names) - {'log', 'registry', 'prometheus'}
+        if unknown:
+            raise ValueError(f"Unknown metrics sink: {', '.join(sorted(unknown))}")
+        if 'log' in names:
+            sinks.append(LogSink())
+        if 'registry' in names or 'prometheus' in names:
+            sinks.append(RegistrySink())
+        if 'prometheus' in names:
+            sinks.append(PrometheusFileSink(sinks[-1].registry, settings['prometheus_file'],
+                                            settings['prometheus_interval']))
+        return Instrumentation(sinks)
+
+    @property
+    def registry(self):
+        for sink in self.sinks:
+            if isinstance(sink, RegistrySink):
+                return sink.registry
+        return None
+
+    def record(self, kind, name, seconds, rows=0):
+        for sink in self.sinks:
+            sink.record(kind, name, seconds, rows)
+
+    def flush(self):
+        for sink in self.sinks:
+            if hasattr(sink, 'flush'):
+                sink.flush()
+
+    def instrument(self, repo):
+        # Wraps the repository's public methods and its connection pool on
+        # this instance only. An uninstrumented repository runs the
+        # original code with no extra calls at all.
+        for method_name in INSTRUMENTED_METHODS:
+            method = getattr(repo, method_name)
+            if inspect.isgeneratorfunction(method):
+                setattr(repo, method_name, self._timed_iteration(method_name, method))
+            else:
+                setattr(repo, method_name, self._timed(method_name, method))
+        repo.pool = InstrumentedPool(repo.pool, self)
+        return repo
+
+    def statement(self, sql):
+        name = self._names.get(sql)
+        if name is None:
+            name = self._names[sql] = statement_name(sql)
+        return name
+
+    def _timed(self, name, method):
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.record('method', name, time.perf_counter() - start)
+        return timed
+
+    def _timed_iteration(self, name, method):
+        # Calling a generator method only creates the generator, so time
+        # is summed over each step of the iteration instead, leaving out
+        # the consumer's own work between items. Recorded once, when the
+        # iteration ends or is closed, with the rows yielded (a chunk
+        # counts its rows).
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            iterator = method(*args, **kwargs)
+            seconds = 0.0
+            rows = 0
+            try:
+                while True:
+                    start = time.perf_counter()
+                    try:
+                        item = next(iterator)
+                    except StopIteration:
+                        return
+                    finally:
+                        seconds += time.perf_counter() - start
+                    rows += len(item) if isinstance(item, list) else 1
+                    yield item
+            finally:
+                iterator.close()
+                self.record('method', name, seconds, rows)
+        return timed
+
+
+# A statement is recorded once its rows have been read, i.e. on the next
+# execute or when the cursor closes, so the row count lands on the same
+# series as the statement's latency.
+class InstrumentedCursor:
+    def __init__(self, cursor, instrumentation):
+        self._cursor = cursor
+        self._instrumentation = instrumentation
+        self._pending = None
+
+    def execute(self, sql, *args, **kwargs):
+        return self._timed(sql, self._cursor.execute, sql, *args, **kwargs)
+
+    def executemany(self, sql, *args, **kwargs):
+        return self._timed(sql, self._cursor.executemany, sql, *args, **kwargs)
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None and self._pending:
+            self._pending[2] += 1
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        if self._pending:
+            self._pending[2] += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        if self._pending:
+            self._pending[2] += len(rows)
+        return rows
+
+    def close(self):
+        self._flush()
+        return self._cursor.close()
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def _timed(self, sql, call, *args, **kwargs):
+        self._flush()
+        start = time.perf_counter()
+        try:
+            return call(*args, **kwargs)
+        finally:
+            self._pending = [self._instrumentation.statement(sql),
+                             time.perf_counter() - start, 0]
+
+    def _flush(self):
+        if self._pending:
+            name, seconds, rows = self._pending
+            self._pending = None
+            self._instrumentation.record('sql', name, seconds, rows)
+
+
+class InstrumentedConnection:
+    def __init__(self, connection, instrumentation):
+        self._connection = connection
+        self._instrumentation = instrumentation
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._connection.cursor(*args, **kwargs), self._instrumentation)
+
+    def commit(self):
+        start = time.perf_counter()
+        try:
+            return self._connection.commit()
+        finally:
+            self._instrumentation.record('sql', 'COMMIT', time.perf_counter() - start)
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+
+class InstrumentedPool:
+    def __init__(self, pool, instrumentation):
+        self._pool = pool
+        self._instrumentation = instrumentation
+
+    @contextmanager
+    def connection(self):
+        start = time.perf_counter()
+        with self._pool.connection() as connection:
+            self._instrumentation.record('pool', 'checkout', time.perf_counter() - start)
+            yield InstrumentedConnection(connection, self._instrumentation)
+
+    def __getattr__(self, name):
+        return getattr(self._pool, name)
@@ -0,0 +1,23 @@
+class LoanCalculator:
+    @staticmethod
+    def emi_amount(principal_amount, interest_rate, loan_term):
+        monthly_rate = interest_rate / 12 / 100
+        if monthly_rate == 0:
+            return principal_amount / loan_term
+        emi = (principal_amount * monthly_rate * (1 + monthly_rate)**loan_term) / \
+              ((1 + monthly_rate)**loan_term - 1)
+        return emi
+
+    @staticmethod
+    def interest_amount(principal_amount, interest_rate, loan_term):
+        return (principal_amount * interest_rate * loan_term) / (12 * 100)
+
+    @staticmethod
+    def repayment_terms(principal_amount, interest_rate, loan_term):
+        # EMI, total interest and total payable, rounded to cents as they
+        # are stored on the Loan row. Total payable is what the borrower
+        # repays, the stored EMI over the term; total interest stays the
+        # simple-interest figure calculate_interest has always reported.
+        emi = round(LoanCalculator.emi_amount(principal_amount, interest_rate, loan_term), 2)
+        interest = LoanCalculator.interest_amount(principal_amount, interest_rate, loan_term)
+        return emi, round(interest, 2), round(emi * loan_term, 2)
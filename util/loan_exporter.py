@@ -0,0 +1,97 @@
+import csv
+import json
+import sys
+from dao.loan_sql import LOAN_SELECT_COLUMNS
+
+EXPORT_FORMATS = ('csv', 'jsonl', 'parquet')
+
+# DECIMAL in MySQL, REAL in SQLite; JSONL and Parquet store them as floats.
+DECIMAL_COLUMNS = ('principal_amount', 'interest_rate')
+
+
+# Writes the joined loan book straight from ILoanRepository.iter_loan_rows
+# to a file, one chunk at a time, without building Loan entities. Memory is
+# bounded by chunk_size rows whatever the size of the book. The output has
+# the same columns as LoanFileUtil reads, so an export can be applied again.
+class LoanExporter:
+    @staticmethod
+    def export(loan_repo, f, file_format, chunk_size=10000) -> int:
+        chunks = loan_repo.iter_loan_rows(fetch_size=chunk_size)
+        if file_format == 'csv':
+            return LoanExporter.write_csv(chunks, f)
+        if file_format == 'jsonl':
+            return LoanExporter.write_jsonl(chunks, f)
+        if file_format == 'parquet':
+            return LoanExporter.write_parquet(chunks, f)
+        raise ValueError(f"Unknown export format: {file_format}")
+
+    @staticmethod
+    def write_csv(chunks, f) -> int:
+        writer = csv.writer(f)
+        writer.writerow(LOAN_SELECT_COLUMNS)
+        count = 0
+        for rows in chunks:
+            writer.writerows(rows)
+            count += len(rows)
+        return count
+
+    @staticmethod
+    def write_jsonl(chunks, f) -> int:
+        encoder = json.JSONEncoder(default=float)
+        count = 0
+        for rows in chunks:
+            f.write("".join([encoder.encode(dict(zip(LOAN_SELECT_COLUMNS, row))) + "\n"
+                             for row in rows]))
+            count += len(rows)
+        return count
+
+    @staticmethod
+    def write_parquet(chunks, f) -> int:
+        # One row group per chunk. pyarrow is only needed for this format.
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Parquet export needs pyarrow: pip install pyarrow")
+
+        schema = pa.schema([
+            ('loan_id', pa.int64()),
+            ('customer_id', pa.int64()),
+            ('principal_amount', pa.float64()),
+            ('interest_rate', pa.float64()),
+            ('loan_term', pa.int32()),
+            ('loan_type', pa.string()),
+            ('loan_status', pa.string()),
+            ('name', pa.string()),
+            ('email_address', pa.string()),
+            ('phone_number', pa.string()),
+            ('address', pa.string()),
+            ('credit_score', pa.int32()),
+            ('property_address', pa.string()),
+            ('property_value', pa.int64()),
+            ('car_model', pa.string()),
+            ('car_value', pa.int64())
+        ])
+        decimal_indexes = {LOAN_SELECT_COLUMNS.index(column) for column in DECIMAL_COLUMNS}
+        count = 0
+        with pq.ParquetWriter(f, schema) as writer:
+            for rows in chunks:
+                columns = []
+                for index, values in enumerate(zip(*rows)):
+                    if index in decimal_indexes:
+                        values = [None if value is None else float(value) for value in values]
+                    columns.append(pa.array(values, type=schema.field(index).type))
+                writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+                count += len(rows)
+        return count
+
+    @staticmethod
+    def open_output(path, file_format):
+        # "-" is stdout.
+        if path == "-":
+            if file_format == 'parquet':
+                return sys.stdout.buffer
+            return sys.stdout
+        if file_format == 'parquet':
+            return open(path, "wb")
+        return open(path, "w", newline="")
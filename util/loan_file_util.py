@@ -0,0 +1,72 @@
+import csv
+import json
+import os
+from entities.customer import Customer
+from entities.loan import Loan
+from entities.home_loan import HomeLoan
+from entities.car_loan import CarLoan
+
+FILE_FORMATS = ('csv', 'jsonl')
+
+
+# Flat loan records for batch files: one row per loan, customer and subtype
+# columns inline, blank where they do not apply; the same columns
+# LoanExporter writes. Records are read as a generator over the file, so
+# any size streams in constant memory.
+class LoanFileUtil:
+    @staticmethod
+    def file_format(path, file_format=None, formats=FILE_FORMATS):
+        if file_format:
+            return file_format
+        extension = os.path.splitext(path)[1].lstrip(".").lower()
+        if extension == "json":
+            extension = "jsonl"
+        if extension not in formats:
+            raise ValueError(f"Cannot tell the format of {path}; use one of: "
+                             f"{', '.join(formats)}")
+        return extension
+
+    @staticmethod
+    def read_loans(f, file_format, rejected=None):
+        # A malformed record raises ValueError, or, given a rejected list,
+        # is appended to it as (record number, error) and skipped, so the
+        # records around it still go in.
+        if file_format == 'csv':
+            records = csv.DictReader(f)
+        else:
+            records = (line for line in f if line.strip())
+        for record_number, record in enumerate(records, 1):
+            try:
+                if file_format != 'csv':
+                    record = json.loads(record)
+                yield LoanFileUtil.build_loan(record)
+            except (KeyError, TypeError, ValueError) as e:
+                if rejected is None:
+                    raise ValueError(f"Invalid loan record {record_number}: {e!r}")
+                rejected.append((record_number, f"Invalid loan record: {e!r}"))
+
+    @staticmethod
+    def build_loan(record) -> Loan:
+        customer = Customer(
+            customer_id=int(record['customer_id']),
+            name=record.get('name'),
+            email_address=record.get('email_address'),
+            phone_number=record.get('phone_number'),
+            address=record.get('address'),
+            credit_score=int(record['credit_score'])
+        )
+        loan_id = int(record['loan_id'])
+        principal_amount = float(record['principal_amount'])
+        interest_rate = float(record['interest_rate'])
+        loan_term = int(record['loan_term'])
+        loan_status = record.get('loan_status') or "Pending"
+
+        if record['loan_type'] == "HomeLoan":
+            return HomeLoan(loan_id, customer, principal_amount, interest_rate, loan_term,
+                            loan_status, record.get('property_address'),
+                            int(record['property_value']))
+        elif record['loan_type'] == "CarLoan":
+            return CarLoan(loan_id, customer, principal_amount, interest_rate, loan_term,
+                           loan_status, record.get('car_model'), int(record['car_value']))
+        return Loan(loan_id, customer, principal_amount, interest_rate, loan_term,
+                    record['loan_type'], loan_status)
@@ -0,0 +1,161 @@
+import os
+from datetime import date
+from entities.payment import Payment
+from exceptions.invalid_loan_exception import InvalidLoanException
+
+# Applies payments to loan balances in whole EMIs. Each EMI is split into
+# interest on the opening balance and principal, month by month as in
+# AmortizationSchedule, and the final instalment is whatever clears the
+# balance left, so it must be paid in full.
+# Any amount beyond the EMIs it covers is not applied, as before.
+#
+# The backends share everything but the storage: post() batches the
+# payments, skips references seen earlier in the run and replays a batch
+# one payment at a time when its transaction fails, calling the backend's
+# write_batch(batch) -> (posted, rejected, duplicates) for each batch.
+class PaymentPosting:
+    @staticmethod
+    def repayment(loan_id, amount) -> Payment:
+        # A one-off payment from loan_repayment, under a fresh reference.
+        return Payment(os.urandom(16).hex(), loan_id, amount)
+
+    @staticmethod
+    def report_repayment(payment, result) -> None:
+        if result['rejected']:
+            raise InvalidLoanException(result['rejected'][0][1])
+
+        remaining_amount = payment.amount - (payment.principal_paid + payment.interest_paid)
+        print(f"Payment successful. {payment.emis_paid} EMIs paid.")
+        if remaining_amount >= 0.01:
+            print(f"Remaining amount: {remaining_amount:.2f} will not be applied to next EMI.")
+
+    @staticmethod
+    def batches(payments, batch_size, result):
+        # A reference seen twice in the run counts as a duplicate once the
+        # first is batched; references posted by earlier runs are for
+        # write_batch to skip.
+        seen = set()
+        batch = []
+        for payment in payments:
+            if payment.payment_reference in seen:
+                result['duplicates'] += 1
+                continue
+            seen.add(payment.payment_reference)
+            batch.append(payment)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    @staticmethod
+    def post(payments, batch_size, write_batch, errors=()) -> dict:
+        # errors are the exception types that fail a batch's transaction.
+        result = {'posted': 0, 'duplicates': 0, 'rejected': []}
+        for batch in PaymentPosting.batches(payments, batch_size, result):
+            PaymentPosting._post_batch(batch, result, write_batch, errors)
+        return result
+
+    @staticmethod
+    def _post_batch(batch, result, write_batch, errors) -> None:
+        try:
+            written = write_batch(batch)
+        except errors as e:
+            if len(batch) == 1:
+                result['rejected'].append((batch[0], str(e)))
+                return
+            # Most likely another poster committed one of these references
+            # first; replay one by one so the rest still go in.
+            for payment in batch:
+                PaymentPosting._post_batch([payment], result, write_batch, errors)
+            return
+        PaymentPosting._tally(result, *written)
+
+    @staticmethod
+    async def post_async(payments, batch_size, write_batch, errors=()) -> dict:
+        # post() for a coroutine write_batch.
+        result = {'posted': 0, 'duplicates': 0, 'rejected': []}
+        for batch in PaymentPosting.batches(payments, batch_size, result):
+            await PaymentPosting._post_batch_async(batch, result, write_batch, errors)
+        return result
+
+    @staticmethod
+    async def _post_batch_async(batch, result, write_batch, errors) -> None:
+        try:
+            written = await write_batch(batch)
+        except errors as e:
+            if len(batch) == 1:
+                result['rejected'].append((batch[0], str(e)))
+                return
+            for payment in batch:
+                await PaymentPosting._post_batch_async([payment], result, write_batch, errors)
+            return
+        PaymentPosting._tally(result, *written)
+
+    @staticmethod
+    def _tally(result, posted, rejected, duplicates) -> None:
+        result['posted'] += len(posted)
+        result['duplicates'] += duplicates
+        result['rejected'].extend(rejected)
+
+    @staticmethod
+    def allocate(payments, loans):
+        # loans maps loan_id to the posting_state() of that loan, whose 'emi'
+        # is the stored EMI calculate_emi reports. It is updated in place, so
+        # several payments against one loan in the same batch are applied
+        # one after another. Returns the posted payments,
+        # with their split filled in, and (payment, reason) for the rest.
+        posted = []
+        rejected = []
+        for payment in payments:
+            loan = loans.get(payment.loan_id)
+            if loan is None:
+                rejected.append((payment, f"Loan not found with ID: {payment.loan_id}"))
+                continue
+            if loan['remaining_emis'] <= 0:
+                rejected.append((payment, f"Loan {payment.loan_id} is fully repaid."))
+                continue
+
+            emi = loan['emi']
+            if emi is None:
+                rejected.append((payment, f"Loan {payment.loan_id} has invalid terms."))
+                continue
+            # Instalments are taken in order while the amount covers them.
+            # Each is one EMI, except the final one, which is whatever
+            # clears the balance with its interest: with a rounded EMI that
+            # can be a few cents more or less than the EMI.
+            amount = float(payment.amount)
+            monthly_rate = loan['interest_rate'] / 12 / 100
+            balance = loan['outstanding_balance']
+            interest_paid = 0.0
+            principal_paid = 0.0
+            emis = 0
+            for remaining in range(loan['remaining_emis'], 0, -1):
+                interest = balance * monthly_rate
+                principal = balance if remaining == 1 else emi - interest
+                if round(principal_paid + interest_paid + principal + interest, 2) > amount:
+                    break
+                interest_paid += interest
+                principal_paid += principal
+                balance -= principal
+                emis += 1
+            if emis == 0:
+                if remaining == 1:
+                    reason = (f"Payment amount is less than the final instalment of "
+                              f"{principal + interest:.2f}. Payment rejected.")
+                else:
+                    reason = "Payment amount is less than one EMI. Payment rejected."
+                rejected.append((payment, reason))
+                continue
+
+            loan['outstanding_balance'] = round(balance, 2)
+            loan['remaining_emis'] -= emis
+            payment.emis_paid = emis
+            payment.principal_paid = round(principal_paid, 2)
+            payment.interest_paid = round(interest_paid, 2)
+            payment.outstanding_balance = loan['outstanding_balance']
+            payment.remaining_emis = loan['remaining_emis']
+            if payment.payment_date is None:
+                payment.payment_date = date.today()
+            posted.append(payment)
+        return posted, rejected
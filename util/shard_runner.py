@@ -0,0 +1,204 @@
+import csv
+import json
+import math
+import os
+import sys
+import shutil
+import time
+from dao.loan_repository_factory import LoanRepositoryFactory
+from util.db_property_util import DBPropertyUtil
+from util.loan_calculator import LoanCalculator
+
+STATE_FILE = "state.json"
+
+# Repository of the current worker process, opened once by the pool
+# initializer so every shard a worker runs reuses the same connection.
+_worker_repo = None
+
+
+# Jobs are called as job(repo, first_id, last_id, output_path, options) for
+# the inclusive loan_id range of one shard; options holds page_size and
+# loan_status.
+def rescore_shard(repo, first_id, last_id, output_path, options):
+    # Decides the shard's loans in options['loan_status'] (None: every loan)
+    # one page_size-wide id range per transaction, in the database, without
+    # loading the loans.
+    counts = {'loans': 0, 'Approved': 0, 'Rejected': 0}
+    page_size = options['page_size']
+    for start in range(first_id, last_id + 1, page_size):
+        decided = repo.decide_loans(loan_status=options['loan_status'],
+                                    loan_id_range=(start, min(start + page_size - 1, last_id)))
+        counts['loans'] += decided['Approved'] + decided['Rejected']
+        counts['Approved'] += decided['Approved']
+        counts['Rejected'] += decided['Rejected']
+    return counts
+
+
+def emi_shard(repo, first_id, last_id, output_path, options):
+    pages = _shard_pages(repo, first_id, last_id, options['page_size'])
+    counts = {'loans': 0}
+    with open(output_path + ".csv.tmp", "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(('loan_id', 'emi', 'interest'))
+        for page in pages:
+            writer.writerows((
+                loan.loan_id,
+                round(LoanCalculator.emi_amount(float(loan.principal_amount),
+                                                float(loan.interest_rate), loan.loan_term), 2),
+                round(LoanCalculator.interest_amount(float(loan.principal_amount),
+                                                     float(loan.interest_rate), loan.loan_term), 2)
+            ) for loan in page)
+            counts['loans'] += len(page)
+    os.replace(output_path + ".csv.tmp", output_path + ".csv")
+    return counts
+
+
+def schedule_shard(repo, first_id, last_id, output_path, options):
+    from util.amortization import AmortizationSchedule
+    pages = _shard_pages(repo, first_id, last_id, options['page_size'])
+    columns = {'loan_id': [], 'principal_amount': [], 'interest_rate': [], 'loan_term': []}
+    for page in pages:
+        for loan in page:
+            columns['loan_id'].append(loan.loan_id)
+            columns['principal_amount'].append(float(loan.principal_amount))
+            columns['interest_rate'].append(float(loan.interest_rate))
+            columns['loan_term'].append(loan.loan_term)
+    # A directory cannot be replaced in one step: drop what an interrupted
+    # attempt left behind, then rename the finished one into place.
+    shutil.rmtree(output_path + ".tmp", ignore_errors=True)
+    rows = AmortizationSchedule.write_schedules(columns, output_path + ".tmp")
+    shutil.rmtree(output_path, ignore_errors=True)
+    os.replace(output_path + ".tmp", output_path)
+    return {'loans': len(columns['loan_id']), 'schedule_rows': rows}
+
+
+JOBS = {
+    'rescore': rescore_shard,
+    'emi': emi_shard,
+    'schedules': schedule_shard
+}
+
+
+def _init_worker(property_file):
+    global _worker_repo
+    _worker_repo = LoanRepositoryFactory.create(property_file)
+
+
+def _shard_pages(repo, first_id, last_id, page_size):
+    page = []
+    for loan in repo.iter_loans(batch_size=page_size, after_loan_id=first_id - 1):
+        if loan.loan_id > last_id:
+            break
+        page.append(loan)
+        if len(page) == page_size:
+            yield page
+            page = []
+    if page:
+        yield page
+
+
+def _run_shard(job, index, first_id, last_id, output_dir, options):
+    start = time.perf_counter()
+    output_path = os.path.join(output_dir, f"shard-{index:05d}")
+    counts = JOBS[job](_worker_repo, first_id, last_id, output_path, options)
+    return index, counts, time.perf_counter() - start
+
+
+# Runs a month-end job over the loan book in parallel. The book is split into
+# loan_id ranges (shards), and each shard is processed by a worker process
+# with its own repository and connection. The plan and every finished shard
+# are recorded in output_dir/state.json, so a rerun after a crash or an
+# interrupt picks up with the shards that had not finished. Shard outputs
+# are written under a temporary name and renamed when complete.
+class ShardRunner:
+    def __init__(self, job, property_file="config.ini", output_dir=None, workers=None,
+                 shards=None, page_size=1000, loan_status="Pending"):
+        if job not in JOBS:
+            raise ValueError(f"Unknown job: {job}")
+        settings = DBPropertyUtil.get_backend_settings(property_file)
+        if settings['backend'] == 'memory' or (settings['backend'] == 'sqlite' and
+                                               settings['sqlite_path'] == ':memory:'):
+            raise ValueError("Sharded jobs need a database the worker processes can share")
+        self.job = job
+        self.property_file = property_file
+        self.output_dir = output_dir or os.path.join("jobs", job)
+        self.workers = workers or os.cpu_count() or 1
+        self.shards = shards or self.workers * 4
+        self.page_size = page_size
+        self.loan_status = loan_status
+
+    def run(self, restart=False) -> dict:
+        # Imported here so main.py does not load multiprocessing at startup.
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        os.makedirs(self.output_dir, exist_ok=True)
+        state = None if restart else self._load_state()
+        if state is None:
+            state = self._plan()
+            self._save_state(state)
+
+        pending = [(index, first_id, last_id)
+                   for index, (first_id, last_id) in enumerate(state['shards'])
+                   if str(index) not in state['completed']]
+        total = len(state['shards'])
+        if len(pending) < total:
+            print(f"Resuming {self.job}: {total - len(pending)} of {total} shards already done",
+                  file=sys.stderr)
+
+        start = time.perf_counter()
+        loans = 0
+        with ProcessPoolExecutor(max_workers=min(self.workers, max(len(pending), 1)),
+                                 initializer=_init_worker,
+                                 initargs=(self.property_file,)) as executor:
+            options = {'page_size': self.page_size, 'loan_status': self.loan_status}
+            futures = [executor.submit(_run_shard, self.job, index, first_id, last_id,
+                                       self.output_dir, options)
+                       for index, first_id, last_id in pending]
+            for future in as_completed(futures):
+                index, counts, seconds = future.result()
+                state['completed'][str(index)] = counts
+                self._save_state(state)
+                loans += counts['loans']
+                elapsed = time.perf_counter() - start
+                print(f"[{len(state['completed'])}/{total}] shard {index} "
+                      f"({state['shards'][index][0]}-{state['shards'][index][1]}): "
+                      f"{counts['loans']} loans in {seconds:.1f}s, "
+                      f"{loans / elapsed:.0f} loans/s overall", file=sys.stderr)
+
+        totals = {}
+        for counts in state['completed'].values():
+            for key, value in counts.items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def _plan(self) -> dict:
+        repo = LoanRepositoryFactory.create(self.property_file)
+        first = repo.find_loans(order_by="loan_id", limit=1)
+        last = repo.find_loans(order_by="-loan_id", limit=1)
+        shards = []
+        if first:
+            first_id, last_id = first[0].loan_id, last[0].loan_id
+            width = math.ceil((last_id - first_id + 1) / self.shards)
+            shards = [[start, min(start + width - 1, last_id)]
+                      for start in range(first_id, last_id + 1, width)]
+        return {'job': self.job, 'loan_status': self.loan_status, 'shards': shards,
+                'completed': {}}
+
+    def _load_state(self):
+        path = os.path.join(self.output_dir, STATE_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            state = json.load(f)
+        if state['job'] != self.job:
+            raise ValueError(f"{self.output_dir} holds a {state['job']} run, not {self.job}")
+        if state.get('loan_status', "Pending") != self.loan_status:
+            raise ValueError(f"{self.output_dir} holds a run over "
+                             f"{state.get('loan_status') or 'all'} loans, not "
+                             f"{self.loan_status or 'all'}; restart it to change")
+        return state
+
+    def _save_state(self, state) -> None:
+        path = os.path.join(self.output_dir, STATE_FILE)
+        with open(path + ".tmp", "w") as f:
+            json.dump(state, f)
+        os.replace(path + ".tmp", path)